@@ -1,47 +1,158 @@
+from enum import Enum
+
 import numpy as np
-from scipy.stats import norm
+from scipy.special import ndtr
+
+from Options_Pricing import instrumentation
+from Options_Pricing.base import OptionPricingModel, EXERCISE_STYLE
+from Options_Pricing.Black_Scholes_Model import _broadcast_contracts, _d1_d2
+
+
+class TREE_METHOD(Enum):
+    CRR='CRR'    # Cox-Ross-Rubinstein
+    LR='LR'      # Leisen-Reimer, Peizer-Pratt inversion on an odd number of steps
+    BBS='BBS'    # binomial Black-Scholes: closed-form prices replace the last step
+    BBSR='BBSR'  # BBS with two-point Richardson extrapolation over n and n/2 steps
+
+
+def _peizer_pratt(z, n):
+    """Peizer-Pratt method 2 inversion of the normal CDF to a binomial probability."""
+    return 0.5+np.sign(z)*0.5*np.sqrt(1.0-np.exp(-(z/(n+1/3+0.1/(n+1)))**2*(n+1/6)))
+
+
+def _tree_parameters(S, K, T, r, sigma, number_of_time_steps, method):
+    dT=T/number_of_time_steps
+    a=np.exp(r*dT) # risk-free rate compounded
+    if method==TREE_METHOD.LR.value:
+        d1,d2=_d1_d2(S,K,T,r,sigma)
+        p=_peizer_pratt(d2,number_of_time_steps)
+        u=a*_peizer_pratt(d1,number_of_time_steps)/p
+        d=(a-p*u)/(1.0-p)
+    else:
+        u=np.exp(sigma*np.sqrt(dT))
+        d=1.0/u
+        p=(a-d)/(u-d)  # risk neutral up probability
+    return dT,u,d,p
+
+
+def _layer_values(S, K, r, sigma, dT, u, d, layer, phi, smoothed):
+    """
+        Node prices S*u**j*d**(layer-j) of one tree layer, built as a single geometric progression in j, and the
+        option values on them: the payoff, or for BBS the closed-form price over the one remaining step.
+    """
+    j=np.arange(layer+1)[:,None]
+    S_layer=S*np.exp(j*np.log(u)+(layer-j)*np.log(d))
+    V=np.empty_like(S_layer)
+    np.subtract(S_layer,K,out=V)
+    V*=phi
+    np.maximum(V,0.0,out=V)
+    if smoothed:
+        d1,d2=_d1_d2(S_layer,K,dT,r,sigma)
+        black_scholes=phi*(S_layer*ndtr(phi*d1)-K*np.exp(-r*dT)*ndtr(phi*d2))
+        return S_layer,black_scholes,V
+    return S_layer,V,V
+
+
+@instrumentation.timed('backward_induction')
+def _roll_back(S_layer, V, K, r, dT, d, p, phi):
+    """
+        Backward induction with early exercise for a batch of contracts sharing the step count.
+        Values live in the (layer + 1, contracts) buffer V whose leading rows shrink by one node per step, so every
+        update is an in-place ufunc on a contiguous block and memory stays O(steps * contracts) for the whole
+        roll-back.
+    """
+    layer=V.shape[0]-1
+    discount=np.exp(-r*dT)
+    discounted_p=discount*p
+    discounted_q=discount*(1.0-p)
+    down=1.0/d
+    scratch=np.empty((max(layer,1),V.shape[1]))
+
+    for i in range(layer-1,-1,-1):
+        # V[:i+1] = discount * (p * V[1:i+2] + q * V[:i+1]), without temporaries
+        np.multiply(V[1:i+2],discounted_p,out=scratch[:i+1])
+        V[:i+1]*=discounted_q
+        V[:i+1]+=scratch[:i+1]
+        # Node prices one step earlier are the later ones moved back by one down factor
+        S_layer[:i+1]*=down
+        np.subtract(S_layer[:i+1],K,out=scratch[:i+1])
+        scratch[:i+1]*=phi
+        np.maximum(V[:i+1],scratch[:i+1],out=V[:i+1])
+
+    return V[0]
+
+
+def _price(S, K, T, r, sigma, number_of_time_steps, is_call, exercise_style, method=TREE_METHOD.CRR.value):
+    if method==TREE_METHOD.BBSR.value:
+        # BBS errors shrink like 1/n, so 2*P(n) - P(n/2) cancels the leading term
+        coarse=_price(S,K,T,r,sigma,max(number_of_time_steps//2,1),is_call,exercise_style,TREE_METHOD.BBS.value)
+        fine=_price(S,K,T,r,sigma,number_of_time_steps,is_call,exercise_style,TREE_METHOD.BBS.value)
+        return 2*fine-coarse
+    if method==TREE_METHOD.LR.value:
+        number_of_time_steps+=1-number_of_time_steps%2
+
+    n=number_of_time_steps
+    smoothed=method==TREE_METHOD.BBS.value
+    layer=n-1 if smoothed else n
+    phi=np.where(is_call,1.0,-1.0)
+    dT,u,d,p=_tree_parameters(S,K,T,r,sigma,n,method)
+
+    # Without early exercise the roll-back collapses to the discounted expectation of the layer values under the
+    # binomial distribution of up-moves, which costs O(steps) instead of O(steps**2)
+    from scipy.stats import binom
+
+    _,V,_=_layer_values(S,K,r,sigma,dT,u,d,layer,phi,smoothed)
+    weights=binom.pmf(np.arange(layer+1)[:,None],layer,p)
+    prices=np.exp(-r*dT*layer)*np.einsum('ij,ij->j',weights,V)
+
+    if exercise_style==EXERCISE_STYLE.AMERICAN.value:
+        # Without dividends an American call is never exercised early while rates are non-negative,
+        # so only the remaining contracts need the O(steps**2) roll-back
+        early=~(is_call&(r>=0))
+        if np.any(early):
+            S_early,K_early,r_early,sigma_early,phi_early=S[early],K[early],r[early],sigma[early],phi[early]
+            dT_early,u_early,d_early,p_early=dT[early],u[early],d[early],p[early]
+            S_layer,V,exercise=_layer_values(S_early,K_early,r_early,sigma_early,dT_early,u_early,d_early,layer,
+                                             phi_early,smoothed)
+            np.maximum(V,exercise,out=V)
+            prices[early]=_roll_back(S_layer,V,K_early,r_early,dT_early,d_early,p_early,phi_early)
+    return prices
 
-from Options_Pricing.base import OptionPricingModel
 
 class BinomialTreePricing(OptionPricingModel):
-    def __init__(self,underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, sigma, number_of_time_steps):
+    def __init__(self,underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, sigma, number_of_time_steps,
+                 exercise_style=EXERCISE_STYLE.EUROPEAN.value, method=TREE_METHOD.CRR.value):
         self.S=underlying_spot_price
         self.K=strike_price
         self.T=days_to_maturity/365
         self.r=risk_free_rate
         self.sigma=sigma
         self.number_of_time_steps=number_of_time_steps
+        self.exercise_style=exercise_style
+        self.method=method
 
     def _calculate_call_option_price(self):
-        dT=self.T/self.number_of_time_steps
-        u=np.exp(self.sigma*np.sqrt(dT))
-        d=1.0/u
+        return self._calculate_option_price(True)
 
-        V=np.zeros(self.number_of_time_steps+1)
-        S_T=np.array([(self.S*u**j*d**(self.number_of_time_steps-j)) for j in range(self.number_of_time_steps+1)])
-
-        a=np.exp(self.r*dT) # risk-free rate compounded
-        p=(a-d)/(u-d)  # risk neutral up probability
-        q=1.0-p  # risk neutral down probability
-
-        V[:] = np.maximum(S_T - self.K, 0.0)
-
-        # Overriding option price
-        for i in range(self.number_of_time_steps - 1, -1, -1):
-            V[:-1] = np.exp(-self.r * dT) * (p * V[1:] + q * V[:-1])
+    def _calculate_put_option_price(self):
+        return self._calculate_option_price(False)
 
-        return V[0]
+    def _calculate_option_price(self, is_call):
+        S,K,T,r,sigma=(np.atleast_1d(np.asarray(x,dtype=np.float64)) for x in (self.S,self.K,self.T,self.r,self.sigma))
+        return _price(S,K,T,r,sigma,self.number_of_time_steps,np.array([is_call]),self.exercise_style,self.method)[0]
 
-    def _calculate_put_option_price(self):
-        dT=self.T/self.number_of_time_steps
-        u=np.exp(self.sigma*np.sqrt(dT))
-        d=1.0/u
-        V = np.zeros(self.number_of_time_steps + 1)
-        S_T=np.array([(self.S*u**j*d**(self.number_of_time_steps-j)) for j in range(self.number_of_time_steps+1)])
-        a=np.exp(self.r*dT)
-        p=(a-d)/(u-d)
-        q=1-p
-        V[:] = np.maximum(self.K - S_T, 0.0)
-        for i in range(self.number_of_time_steps - 1, -1, -1):
-            V[:-1] = np.exp(-self.r * dT) * (p * V[1:] + q * V[:-1])
-        return V[0]
+    @staticmethod
+    def calculate_option_prices(underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, sigma,
+                                number_of_time_steps, option_type, exercise_style=EXERCISE_STYLE.EUROPEAN.value,
+                                method=TREE_METHOD.CRR.value):
+        """
+            Prices a batch of contracts on trees with a common number_of_time_steps; American contracts are rolled
+            back together in one 2-D buffer. Arguments broadcast like BlackScholesModel.calculate_option_prices.
+            method is one of the TREE_METHOD values: 'CRR' (default), 'LR', 'BBS' or 'BBSR'.
+        """
+        S,K,days,r,sigma,is_call=_broadcast_contracts(option_type,underlying_spot_price,strike_price,days_to_maturity,
+                                                      risk_free_rate,sigma)
+        instrumentation.count('contracts_priced',S.size)
+        prices=_price(S.ravel(),K.ravel(),days.ravel()/365,r.ravel(),sigma.ravel(),number_of_time_steps,
+                      is_call.ravel(),exercise_style,method)
+        return prices.reshape(S.shape)
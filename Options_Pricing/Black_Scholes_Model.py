@@ -1,7 +1,35 @@
 import numpy as np
-from  scipy.stats import norm
+from scipy.special import ndtr
+
+from Options_Pricing import instrumentation
+from Options_Pricing.base import OptionPricingModel, OPTION_TYPE
+
+
+def _d1_d2(S, K, T, r, sigma):
+    """Returns d1 and d2, sharing log(S/K) and sigma*sqrt(T) between them."""
+    sigma_sqrt_T = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    return d1, d2
+
+
+def _call_flags(option_type, size=None):
+    """Converts a scalar or array of OPTION_TYPE values into a boolean 'is call' array, broadcast to size if given."""
+    option_type = np.asarray(option_type)
+    is_call = option_type == OPTION_TYPE.CALL_OPTION.value
+    is_put = option_type == OPTION_TYPE.PUT_OPTION.value
+    if not np.all(is_call | is_put):
+        raise ValueError(f"option_type must be '{OPTION_TYPE.CALL_OPTION.value}' or '{OPTION_TYPE.PUT_OPTION.value}'")
+    return is_call if size is None else np.broadcast_to(is_call, size)
+
+
+def _broadcast_contracts(option_type, *values):
+    """
+        Broadcasts numeric contract inputs and option_type against each other.
+        Returns the float64 arrays followed by the boolean 'is call' array, all with the common shape.
+    """
+    return np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in values), _call_flags(option_type))
 
-from Options_Pricing.base import OptionPricingModel
 
 class BlackScholesModel(OptionPricingModel):
     def __init__(self,underlying_spot_price,strike_price,days_to_maturity,risk_free_rate,sigma):
@@ -12,14 +40,82 @@ class BlackScholesModel(OptionPricingModel):
         self.sigma=sigma
 
     def _calculate_call_option_price(self):
-
-        d1 = (np.log(self.S / self.K) + (self.r + 0.5 * self.sigma ** 2) * self.T) / (self.sigma * np.sqrt(self.T))
-        d2 = (np.log(self.S / self.K) + (self.r - 0.5 * self.sigma ** 2) * self.T) / (self.sigma * np.sqrt(self.T))
-        return (self.S * norm.cdf(d1, 0.0, 1.0) - self.K * np.exp(-self.r * self.T) * norm.cdf(d2, 0.0, 1.0))
+        d1, d2 = _d1_d2(self.S, self.K, self.T, self.r, self.sigma)
+        return (self.S * ndtr(d1) - self.K * np.exp(-self.r * self.T) * ndtr(d2))
 
     def _calculate_put_option_price(self):
-        d1 = (np.log(self.S / self.K) + (self.r + 0.5 * self.sigma ** 2) * self.T) / (self.sigma * np.sqrt(self.T))
-        d2 = (np.log(self.S / self.K) + (self.r - 0.5 * self.sigma ** 2) * self.T) / (self.sigma * np.sqrt(self.T))
-        return (self.K * np.exp(-self.r * self.T) * norm.cdf(-d2, 0.0, 1.0) - self.S * norm.cdf(-d1, 0.0, 1.0))
+        d1, d2 = _d1_d2(self.S, self.K, self.T, self.r, self.sigma)
+        return (self.K * np.exp(-self.r * self.T) * ndtr(-d2) - self.S * ndtr(-d1))
+
+    @staticmethod
+    @instrumentation.timed('closed_form')
+    def calculate_option_prices(underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, sigma, option_type):
+        """
+            Prices many contracts in one broadcast pass.
+            Every argument may be a scalar or an array; they are broadcast against each other, so e.g. one spot
+            can be priced against a whole strike/expiry grid. option_type holds OPTION_TYPE values
+            ('Call Option' / 'Put Option'), either one for all contracts or one per contract.
+            Returns a float64 array with the broadcast shape.
+        """
+        S, K, days, r, sigma, is_call = _broadcast_contracts(option_type, underlying_spot_price, strike_price,
+                                                             days_to_maturity, risk_free_rate, sigma)
+        T = days / 365
+        instrumentation.count('contracts_priced', S.size)
+
+        d1, d2 = _d1_d2(S, K, T, r, sigma)
+        # phi=+1 for calls and -1 for puts gives both payoffs from one formula:
+        # phi*(S*N(phi*d1) - K*exp(-rT)*N(phi*d2))
+        phi = np.where(is_call, 1.0, -1.0)
+        return phi * (S * ndtr(phi * d1) - K * np.exp(-r * T) * ndtr(phi * d2))
+
+    @staticmethod
+    @instrumentation.timed('closed_form_greeks')
+    def calculate_greeks(underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, sigma, option_type):
+        """
+            Returns price plus first- and second-order Greeks for many contracts in one fused pass.
+            Arguments broadcast exactly like calculate_option_prices. d1, d2, N(.), n(d1) and exp(-rT) are evaluated
+            once and shared by every Greek. Theta and charm are per year of calendar time passing, vega, vanna
+            and volga are per unit of volatility and rho per unit of rate.
+            Returns a dict of float64 arrays keyed by 'price', 'delta', 'gamma', 'theta', 'vega', 'rho',
+            'vanna', 'volga' and 'charm'.
+        """
+        S, K, days, r, sigma, is_call = _broadcast_contracts(option_type, underlying_spot_price, strike_price,
+                                                             days_to_maturity, risk_free_rate, sigma)
+        T = days / 365
+        instrumentation.count('contracts_priced', S.size)
+
+        sqrt_T = np.sqrt(T)
+        sigma_sqrt_T = sigma * sqrt_T
+        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_sqrt_T
+        d2 = d1 - sigma_sqrt_T
+        phi = np.where(is_call, 1.0, -1.0)
+
+        discounted_K = K * np.exp(-r * T)
+        N_d1 = ndtr(phi * d1)
+        N_d2 = ndtr(phi * d2)
+        n_d1 = np.exp(-0.5 * d1 ** 2) / np.sqrt(2 * np.pi)
+        S_n_d1 = S * n_d1
 
+        vega = S_n_d1 * sqrt_T
+        return {
+            'price': phi * (S * N_d1 - discounted_K * N_d2),
+            'delta': phi * N_d1,
+            'gamma': n_d1 / (S * sigma_sqrt_T),
+            'theta': -S_n_d1 * sigma / (2 * sqrt_T) - phi * r * discounted_K * N_d2,
+            'vega': vega,
+            'rho': phi * T * discounted_K * N_d2,
+            'vanna': -n_d1 * d2 / sigma,
+            'volga': vega * d1 * d2 / sigma,
+            'charm': -n_d1 * (2 * r * T - d2 * sigma_sqrt_T) / (2 * T * sigma_sqrt_T),
+        }
 
+    @staticmethod
+    def calculate_option_chain_prices(chain, spot_column='spot', strike_column='strike', days_column='days_to_maturity',
+                                      rate_column='risk_free_rate', sigma_column='sigma', option_type_column='option_type'):
+        """Prices every row of a DataFrame of contracts; column names can be remapped to match the chain."""
+        return BlackScholesModel.calculate_option_prices(chain[spot_column].to_numpy(),
+                                                         chain[strike_column].to_numpy(),
+                                                         chain[days_column].to_numpy(),
+                                                         chain[rate_column].to_numpy(),
+                                                         chain[sigma_column].to_numpy(),
+                                                         chain[option_type_column].to_numpy())
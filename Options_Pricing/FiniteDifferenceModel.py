@@ -0,0 +1,140 @@
+import numpy as np
+from scipy.linalg import solve_banded
+
+from Options_Pricing import instrumentation
+from Options_Pricing.base import OptionPricingModel, OPTION_TYPE, EXERCISE_STYLE
+
+PENALTY = 1e8
+
+
+class FiniteDifferencePricing(OptionPricingModel):
+    """
+        Class pricing options by solving the Black-Scholes PDE backwards from the payoff on a spot/time grid.
+        Time stepping is Crank-Nicolson, started with four half-size implicit steps (Rannacher smoothing; two on a
+        single-step grid) so the payoff kink does not leave oscillations in delta and gamma. Each step is one
+        tridiagonal solve.
+        American exercise is handled with a penalty iteration, which repeats the banded solve until the set of
+        exercised nodes stops changing.
+        One solve prices every spot on the grid at once, see calculate_price_curve.
+    """
+    def __init__(self, underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, sigma,
+                 number_of_spot_steps=400, number_of_time_steps=200, exercise_style=EXERCISE_STYLE.EUROPEAN.value,
+                 spot_range=4.0):
+        self.S=underlying_spot_price
+        self.K=strike_price
+        self.T=days_to_maturity/365
+        self.r=risk_free_rate
+        self.sigma=sigma
+        self.number_of_time_steps=number_of_time_steps
+        self.exercise_style=exercise_style
+        if spot_range<=1:
+            raise ValueError(f"spot_range must be above 1 so the grid extends past the spot, got {spot_range}")
+        if number_of_spot_steps<2:
+            raise ValueError(f"number_of_spot_steps must be at least 2, got {number_of_spot_steps}")
+        self.number_of_spot_steps=number_of_spot_steps
+        self.spot_range=spot_range
+
+        # The grid runs from 0 to about spot_range * max(S, K), spaced so the spot falls exactly on an interior node
+        M=number_of_spot_steps
+        S_max=spot_range*max(self.S,self.K)
+        self.spot_index=min(max(int(round(M*self.S/S_max)),1),M-1)
+        self.dS=self.S/self.spot_index
+        self.S_grid=np.arange(M+1)*self.dS
+
+        self._solutions={}
+
+    def _operator(self):
+        """Coefficients of V[i-1], V[i], V[i+1] in the discretised Black-Scholes operator at interior nodes."""
+        i=np.arange(1,self.S_grid.size-1)
+        variance_term=self.sigma**2*i**2
+        lower=0.5*(variance_term-self.r*i)
+        diagonal=-(variance_term+self.r)
+        upper=0.5*(variance_term+self.r*i)
+        return lower,diagonal,upper
+
+    def _boundaries(self, is_call, tau, american):
+        """Dirichlet values at S=0 and S=S_max with tau years left to maturity."""
+        discounted_K=self.K*np.exp(-self.r*tau)
+        if is_call:
+            return 0.0,self.S_grid[-1]-discounted_K
+        return (self.K if american else discounted_K),0.0
+
+    def _solve(self, is_call):
+        """Rolls the payoff back to today and returns the option values on S_grid."""
+        if is_call in self._solutions:
+            return self._solutions[is_call]
+        with instrumentation.span('backward_induction',category='finite_difference'):
+            self._solutions[is_call]=self._roll_back(is_call)
+        return self._solutions[is_call]
+
+    def _roll_back(self, is_call):
+        american=self.exercise_style==EXERCISE_STYLE.AMERICAN.value
+        payoff=np.maximum(self.S_grid-self.K,0.0) if is_call else np.maximum(self.K-self.S_grid,0.0)
+        exercise=payoff[1:-1]
+        lower,diagonal,upper=self._operator()
+
+        dtau=self.T/self.number_of_time_steps
+        # The half-size implicit steps replace the first (up to) two full steps, so the total stays T
+        start_up=min(2,self.number_of_time_steps)
+        steps=[(0.5*dtau,1.0)]*(2*start_up)+[(dtau,0.5)]*(self.number_of_time_steps-start_up)
+
+        V=payoff.copy()
+        tau=0.0
+        banded={}
+        for step,theta in steps:
+            if (step,theta) not in banded:
+                ab=np.zeros((3,exercise.size))
+                ab[0,1:]=-theta*step*upper[:-1]
+                ab[1]=1.0-theta*step*diagonal
+                ab[2,:-1]=-theta*step*lower[1:]
+                banded[(step,theta)]=ab
+
+            explicit=(1.0-theta)*step
+            rhs=V[1:-1]+explicit*(lower*V[:-2]+diagonal*V[1:-1]+upper*V[2:])
+            tau+=step
+            V[0],V[-1]=self._boundaries(is_call,tau,american)
+            rhs[0]+=theta*step*lower[0]*V[0]
+            rhs[-1]+=theta*step*upper[-1]*V[-1]
+
+            ab=banded[(step,theta)]
+            interior=solve_banded((1,1),ab,rhs)
+            if american:
+                interior=self._apply_penalty(ab,rhs,interior,exercise)
+            V[1:-1]=interior
+        return V
+
+    @staticmethod
+    def _apply_penalty(ab, rhs, V, exercise, max_iterations=50):
+        """Penalty iteration for the early-exercise constraint V >= exercise value."""
+        active=V<exercise
+        for _ in range(max_iterations):
+            if not np.any(active):
+                break
+            penalty=np.where(active,PENALTY,0.0)
+            penalised=ab.copy()
+            penalised[1]+=penalty
+            V=solve_banded((1,1),penalised,rhs+penalty*exercise)
+            new_active=V<exercise
+            if np.array_equal(new_active,active):
+                break
+            active=new_active
+        return V
+
+    def calculate_price_curve(self, option_type):
+        """
+            Returns the option price, delta and gamma at every grid spot from a single solve, as a dict of arrays
+            keyed by 'spot', 'price', 'delta' and 'gamma'. Greeks are central differences on the grid.
+        """
+        V=self._solve(option_type==OPTION_TYPE.CALL_OPTION.value)
+        delta=np.gradient(V,self.dS)
+        gamma=np.empty_like(V)
+        gamma[1:-1]=(V[2:]-2*V[1:-1]+V[:-2])/self.dS**2
+        gamma[0]=gamma[1]
+        gamma[-1]=gamma[-2]
+        return {'spot': self.S_grid, 'price': V, 'delta': delta, 'gamma': gamma}
+
+    def _calculate_call_option_price(self):
+        return self._solve(True)[self.spot_index]
+
+    def _calculate_put_option_price(self):
+        return self._solve(False)[self.spot_index]
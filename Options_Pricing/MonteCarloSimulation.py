@@ -1,8 +1,115 @@
+import copy
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
-from scipy.stats import norm
-import matplotlib.pyplot as plt
+from scipy.special import ndtri
+
+from Options_Pricing import instrumentation
+from Options_Pricing.base import OptionPricingModel, OPTION_TYPE
+from Options_Pricing.Black_Scholes_Model import BlackScholesModel
+from Options_Pricing.exotic_payoffs import PathPayoff
+
+VARIANCE_REDUCTION_MODES = ('antithetic', 'control_variate', 'sobol', 'halton')
+GREEK_ESTIMATORS = ('pathwise', 'likelihood_ratio', 'bump')
+GREEKS = ('delta', 'gamma', 'vega')
+# Statistic of the discounted terminal price, the control variate of the vanilla payoffs
+TERMINAL = 'discounted_terminal'
+EXECUTORS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+
+
+class _PayoffStatistics:
+    """
+        Running mean and (co)variance of discounted payoff samples, optionally paired with one control variate
+        whose expectation is known. Chunks are merged with Chan's parallel update, so results do not depend on
+        holding all samples at once.
+    """
+    def __init__(self):
+        self.n=0
+        self.mean_y=0.0
+        self.mean_x=0.0
+        self.m2_y=0.0
+        self.m2_x=0.0
+        self.c_xy=0.0
+
+    def add(self, y, x=None):
+        x=y if x is None else x
+        if y.size==0:
+            return
+        chunk=_PayoffStatistics()
+        chunk.n=y.size
+        chunk.mean_y=y.mean()
+        chunk.mean_x=x.mean()
+        dy=y-chunk.mean_y
+        dx=x-chunk.mean_x
+        chunk.m2_y=dy@dy
+        chunk.m2_x=dx@dx
+        chunk.c_xy=dx@dy
+        self.merge(chunk)
+
+    def merge(self, other):
+        if other.n==0:
+            return
+        n=self.n+other.n
+        delta_y=other.mean_y-self.mean_y
+        delta_x=other.mean_x-self.mean_x
+        weight=self.n*other.n/n
+        self.m2_y+=other.m2_y+delta_y**2*weight
+        self.m2_x+=other.m2_x+delta_x**2*weight
+        self.c_xy+=other.c_xy+delta_x*delta_y*weight
+        self.mean_y+=delta_y*other.n/n
+        self.mean_x+=delta_x*other.n/n
+        self.n=n
+
+    def estimate(self, control_mean=None):
+        """Returns (estimate, standard error); with control_mean the control-variate estimator is used."""
+        if self.n<2:
+            return self.mean_y, np.nan
+        variance_y=self.m2_y/(self.n-1)
+        if control_mean is None or self.m2_x==0:
+            return self.mean_y, np.sqrt(variance_y/self.n)
+        beta=self.c_xy/self.m2_x
+        residual_variance=max(variance_y-beta*self.c_xy/(self.n-1),0.0)
+        return self.mean_y-beta*(self.mean_x-control_mean), np.sqrt(residual_variance/self.n)
+
+
+def _brownian_bridge_plan(number_of_steps):
+    """
+        Construction order for a Brownian bridge on a uniform grid: the first normal fixes the terminal point,
+        each following one fills the midpoint of the widest remaining gap, so low QMC dimensions carry the
+        coarse shape of the path.
+    """
+    filled=np.zeros(number_of_steps,dtype=bool)
+    bridge_index=np.zeros(number_of_steps,dtype=np.int64)
+    left_index=np.zeros(number_of_steps,dtype=np.int64)
+    right_index=np.zeros(number_of_steps,dtype=np.int64)
+    left_weight=np.zeros(number_of_steps)
+    right_weight=np.zeros(number_of_steps)
+    std=np.zeros(number_of_steps)
+
+    filled[number_of_steps-1]=True
+    bridge_index[0]=number_of_steps-1
+    std[0]=np.sqrt(number_of_steps)
+    j=0
+    for i in range(1,number_of_steps):
+        while filled[j]:
+            j+=1
+        k=j
+        while not filled[k]:
+            k+=1
+        l=j+((k-1-j)>>1)
+        filled[l]=True
+        bridge_index[i]=l
+        left_index[i]=j
+        right_index[i]=k
+        left_weight[i]=(k-l)/(k+1-j)
+        right_weight[i]=(l+1-j)/(k+1-j)
+        std[i]=np.sqrt((l+1-j)*(k-l)/(k+1-j))
+        j=k+1
+        if j>=number_of_steps:
+            j=0
+    return bridge_index,left_index,right_index,left_weight,right_weight,std
 
-from Options_Pricing.base import OptionPricingModel
 
 class MonteCarloPricing(OptionPricingModel):
     """
@@ -23,39 +130,497 @@ class MonteCarloPricing(OptionPricingModel):
         self.num_of_steps=days_to_maturity
         self.dt=self.T/self.num_of_steps
 
-    def simulate_price(self):
+        self.simulation_results_S=None
+        self.statistics=None
+        self.number_of_paths_simulated=0
+        self.control_variate_means=None
+        self.greek_estimator=None
+        self.bump_size=0.01
+        self.target_statistics=None
+        self.payoffs={}
+
+    def add_payoff(self, name, payoff):
+        """
+            Registers a path-dependent payoff (an exotic_payoffs.PathPayoff) under `name`. Every registered payoff
+            is evaluated on the same simulated paths as the vanilla call and put during simulate_price, so a book
+            of exotics on one underlying costs one simulation; see calculate_payoff_price.
+        """
+        if not isinstance(payoff,PathPayoff):
+            raise ValueError(f"payoff must be a PathPayoff, got {type(payoff).__name__}")
+        reserved=['call','put',TERMINAL]+[f'{option}_{greek}' for option in ('call','put') for greek in GREEKS]
+        if name in reserved:
+            raise ValueError(f"Payoff name {name!r} is reserved")
+        greek_names={f'{other}_{greek}' for other in self.payoffs for greek in GREEKS}
+        if name in greek_names or any(f'{name}_{greek}' in self.payoffs for greek in GREEKS):
+            raise ValueError(f"Payoff name {name!r} clashes with the Greek statistics of another payoff")
+        self.payoffs[name]=payoff
+
+    @instrumentation.timed('simulate')
+    def simulate_price(self, store_paths=False, chunk_size=100_000, variance_reduction=None, seed=20,
+                       target_standard_error=None, replications=16, workers=None, executor='process', greeks=None,
+                       bump_size=0.01, target_statistics=None):
+        """
+            Simulates up to N price paths and accumulates discounted call and put payoff statistics.
+            Paths are streamed in chunks of chunk_size: each chunk is stepped forward in place one day at a time and
+            only its terminal prices are turned into payoff statistics, so peak memory is about chunk_size floats
+            whatever N and the number of steps are. With store_paths=True the full (num_of_steps + 1, N) price
+            matrix is also kept in simulation_results_S, which plot_simulation_results needs.
+
+            variance_reduction is None or one or more of VARIANCE_REDUCTION_MODES:
+              'antithetic'       each normal draw Z is also used as -Z and the pair's payoffs are averaged
+              'control_variate'  the discounted terminal price exp(-rT) * S_T, whose expectation is the spot, is
+                                 the control of the vanilla call and put, and the vanilla payoff at strike K,
+                                 whose closed-form BlackScholesModel price is known, that of registered payoffs
+              'sobol' / 'halton' scrambled quasi-random points mapped to normals and assembled into paths by a
+                                 Brownian bridge; the error is measured across `replications` independent
+                                 scramblings, and each chunk holds a (num_of_steps, points) normal matrix capped
+                                 at about 16 * chunk_size floats
+            The path count never exceeds N. Antithetic pairs need an even count and quasi-random replications a
+            power-of-two number of points each, so N is rounded down to the nearest count that fits, with a warning
+            giving the effective count; number_of_paths_simulated always holds the paths actually used.
+
+            With target_standard_error set, simulation stops as soon as the standard error of every statistic in
+            target_statistics is below it; N is then the path budget rather than a fixed count. By default those
+            are everything being estimated: 'call', 'put', every registered payoff and, with greeks, 'call_delta',
+            'put_vega' and so on.
+            As the Greeks have their own scales, target_statistics can name a subset instead, e.g. ('call', 'put').
+
+            With workers set, paths (or quasi-random replications) are split over a 'process' or 'thread' pool.
+            Every worker draws from its own Generator spawned from SeedSequence(seed), and the partial statistics
+            are merged in worker order, so a given seed and worker count always reproduce the same bits.
+            Stored paths are not available in parallel mode.
+
+            Payoffs registered with add_payoff are priced in the same pass: each one keeps running per-path state
+            (averages, extremes, barrier flags) that is updated after every time step of a chunk, so no variance
+            reduction mode or chunk size needs the stored paths. With 'control_variate', the vanilla option of the
+            same type at strike K is the control of every registered payoff.
+
+            With greeks set to one of GREEK_ESTIMATORS, delta, gamma and vega of both options are estimated from the
+            same terminal prices as the price, see calculate_greeks:
+              'pathwise'          derivatives of the discounted payoff along each path (delta, vega), with gamma
+                                  from the likelihood ratio applied to the pathwise delta
+              'likelihood_ratio'  payoff times the derivative of the log density of the terminal price; needs no
+                                  payoff derivative, at the cost of a larger variance
+              'bump'              central finite differences with common random numbers: every path is revalued
+                                  at spot * (1 +- bump_size) and sigma * (1 +- bump_size) from its own Brownian
+                                  increment, so the bumps share all of their noise
+            Registered payoffs depend on the whole path, so their Greeks always come from 'bump' revaluation, see
+            calculate_payoff_greeks: every path is also followed at the four bumped spots and volatilities, each
+            with its own payoff state, rebuilt from the same Brownian motion as the unbumped path.
+        """
+        modes=self._parse_variance_reduction(variance_reduction)
+        planned_paths=self._planned_paths(modes,replications)
+        if planned_paths!=self.N:
+            warnings.warn(f"{self.N} paths do not fit the {sorted(modes)} layout, simulating {planned_paths} instead",
+                          stacklevel=3)
+        if greeks is not None and greeks not in GREEK_ESTIMATORS:
+            raise ValueError(f"Unknown Greek estimator {greeks!r}, expected one of {GREEK_ESTIMATORS}")
+        self.greek_estimator=greeks
+        self.bump_size=bump_size
+        rng=np.random.default_rng(seed)
+        self.number_of_paths_simulated=0
+        self.control_variate_means=None
+        if 'control_variate' in modes:
+            bs=BlackScholesModel(self.S_O,self.K,self.T*365,self.r,self.sigma)
+            self.control_variate_means={'call': bs.calculate_option_price(OPTION_TYPE.CALL_OPTION.value),
+                                        'put': bs.calculate_option_price(OPTION_TYPE.PUT_OPTION.value),
+                                        TERMINAL: float(self.S_O)}
+        self.statistics=self._new_statistics()
+        if target_statistics is None:
+            target_statistics=[name for name in self.statistics if name!=TERMINAL]
+        target_statistics=(target_statistics,) if isinstance(target_statistics,str) else tuple(target_statistics)
+        unknown=[name for name in target_statistics if name not in self.statistics or name==TERMINAL]
+        if unknown:
+            raise ValueError(f"Unknown target statistic(s) {unknown}")
+        self.target_statistics=target_statistics
+
+        self.simulation_results_S=None
+        if store_paths:
+            self.simulation_results_S=np.empty((self.num_of_steps+1,self.N))
+            self.simulation_results_S[0]=self.S_O
+
+        if workers is not None:
+            if store_paths:
+                raise ValueError("store_paths is not supported together with workers")
+            self._simulate_parallel(modes,chunk_size,target_standard_error,replications,seed,workers,executor)
+        elif 'sobol' in modes or 'halton' in modes:
+            self._simulate_quasi_random(rng,modes,chunk_size,target_standard_error,replications)
+        else:
+            self._simulate_pseudo_random(rng,modes,chunk_size,target_standard_error)
+
+        if store_paths:
+            self.simulation_results_S=self.simulation_results_S[:,:min(self.number_of_paths_simulated,self.N)]
+        instrumentation.count('paths_simulated',self.number_of_paths_simulated)
+
+    @staticmethod
+    def _parse_variance_reduction(variance_reduction):
+        if variance_reduction is None:
+            return set()
+        modes={variance_reduction} if isinstance(variance_reduction,str) else set(variance_reduction)
+        unknown=modes.difference(VARIANCE_REDUCTION_MODES)
+        if unknown:
+            raise ValueError(f"Unknown variance reduction mode(s) {sorted(unknown)}, expected {VARIANCE_REDUCTION_MODES}")
+        if {'sobol','halton'}<=modes or ('antithetic' in modes and modes & {'sobol','halton'}):
+            raise ValueError("Quasi-random sequences cannot be combined with each other or with antithetic variates")
+        return modes
+
+    def _planned_paths(self, modes, replications):
+        """Number of paths a full run simulates: N rounded down to what the variance reduction modes allow."""
+        if 'sobol' in modes or 'halton' in modes:
+            if self.N<replications:
+                raise ValueError(f"Quasi-random simulation needs at least replications={replications} paths")
+            return replications*self._points_per_replication(replications)
+        if 'antithetic' in modes:
+            if self.N<2:
+                raise ValueError("Antithetic variates need at least 2 paths")
+            return self.N-self.N%2
+        return self.N
+
+    def _simulate_parallel(self, modes, chunk_size, target_standard_error, replications, seed, workers, executor):
+        quasi_random='sobol' in modes or 'halton' in modes
+        streams=[np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(workers)]
+        # Work is handed out in units of paths (antithetic pairs), or of whole replications for quasi-random
+        # sequences
+        unit=2 if 'antithetic' in modes else 1
+        total=replications if quasi_random else self.N//unit
+        budgets=[(total//workers+(i<total%workers))*(1 if quasi_random else unit) for i in range(workers)]
+        points_per_replication=self._points_per_replication(replications)
+        # Without a target every worker gets its whole share at once; with one, work proceeds in rounds of one
+        # chunk (or replication) per worker so the error can be checked between rounds
+        round_size=budgets if target_standard_error is None else [1 if quasi_random else chunk_size]*workers
+
+        with EXECUTORS[executor](max_workers=workers) as pool:
+            while any(budgets):
+                sizes=[min(size,budget) for size,budget in zip(round_size,budgets)]
+                futures=[pool.submit(_simulate_worker,self,streams[i],modes,chunk_size,sizes[i],quasi_random,
+                                     points_per_replication) if sizes[i] else None for i in range(workers)]
+                for i,future in enumerate(futures):
+                    if future is None:
+                        continue
+                    statistics,paths,streams[i]=future.result()
+                    for name in self.statistics:
+                        self.statistics[name].merge(statistics[name])
+                    self.number_of_paths_simulated+=paths
+                budgets=[budget-size for budget,size in zip(budgets,sizes)]
+                if self._target_reached(target_standard_error):
+                    break
+
+    def _points_per_replication(self, replications):
+        # Sobol points keep their balance properties only in power-of-two blocks; the largest one within budget
+        return 1<<int(np.floor(np.log2(max(self.N//replications,1))))
+
+    def _simulate_pseudo_random(self, rng, modes, chunk_size, target_standard_error, number_of_paths=None):
+        antithetic='antithetic' in modes
+        number_of_paths=self.N if number_of_paths is None else number_of_paths
+        if antithetic:
+            chunk_size+=chunk_size%2
+            number_of_paths-=number_of_paths%2
+        for start in range(0,number_of_paths,chunk_size):
+            paths=min(chunk_size,number_of_paths-start)
+            half=(paths+1)//2
+            if antithetic:
+                # the second half of the chunk mirrors the first one
+                paths=2*half
+
+                def normals():
+                    Z=rng.standard_normal(half)
+                    return np.concatenate([Z,-Z])
+            else:
+                def normals():
+                    return rng.standard_normal(paths)
+
+            payoffs=self._discounted_payoffs(*self._evolve(normals,paths))
+            if antithetic:
+                payoffs={name: 0.5*(y[:half]+y[half:]) for name,y in payoffs.items()}
+            self._add_samples(payoffs)
+            if self._target_reached(target_standard_error):
+                break
+
+    def _simulate_quasi_random(self, rng, modes, chunk_size, target_standard_error, replications,
+                               points_per_replication=None):
+        from scipy.stats import qmc
+
+        if points_per_replication is None:
+            points_per_replication=self._points_per_replication(replications)
+        points_per_chunk=min(points_per_replication,1<<int(np.log2(max(16*chunk_size//self.num_of_steps,1))))
+        plan=_brownian_bridge_plan(self.num_of_steps)
 
-        np.random.seed(20)
-        self.simulation_results=None
+        for _ in range(replications):
+            if 'sobol' in modes:
+                sampler=qmc.Sobol(self.num_of_steps,scramble=True,seed=rng)
+            else:
+                sampler=qmc.Halton(self.num_of_steps,scramble=True,seed=rng)
+            sums=dict.fromkeys(self.statistics,0.0)
+            for _ in range(0,points_per_replication,points_per_chunk):
+                Z=self._brownian_bridge_normals(sampler.random(points_per_chunk),plan)
+                rows=iter(Z)
+                payoffs=self._discounted_payoffs(*self._evolve(lambda: next(rows),points_per_chunk))
+                for name,y in payoffs.items():
+                    sums[name]+=y.sum()
+            # each replication is one independent sample of the QMC estimator
+            self._add_samples({name: np.array([total/points_per_replication]) for name,total in sums.items()})
+            if self._target_reached(target_standard_error):
+                break
 
-        # Initializing price movements for simulation
-        S=np.zeros((self.num_of_steps,self.N))
-        S[0]=self.S_O
-        #initial value is the current spot price
+    @staticmethod
+    def _brownian_bridge_normals(uniforms, plan):
+        """Maps (points, steps) uniforms to (steps, points) per-step standard normal increments."""
+        bridge_index,left_index,right_index,left_weight,right_weight,std=plan
+        z=ndtri(np.clip(uniforms.T,1e-16,1-1e-16))
+        steps=z.shape[0]
+        W=np.empty_like(z)
+        W[steps-1]=std[0]*z[0]
+        for i in range(1,steps):
+            j,k,l=left_index[i],right_index[i],bridge_index[i]
+            if j:
+                W[l]=left_weight[i]*W[j-1]+right_weight[i]*W[k]+std[i]*z[i]
+            else:
+                W[l]=right_weight[i]*W[k]+std[i]*z[i]
+        # W is on a unit time grid, so its increments are already standard normal
+        W[1:]-=W[:-1].copy()
+        return W
 
-        for t in range(1,self.num_of_steps):
-            #Random values to simulate Brownian motion (gaussian distribution)
-            Z=np.random.standard_normal(self.N)
+    def _evolve(self, normals, paths):
+        """
+            Steps `paths` prices from spot to maturity, drawing one row of normals per day, and updates the running
+            state of every registered payoff after each step; returns the terminal prices and those states.
+        """
+        drift=(self.r-0.5*self.sigma**2)*self.dt
+        diffusion=self.sigma*np.sqrt(self.dt)
+        first=self.number_of_paths_simulated
+        last=min(first+paths,self.N)
 
-            # Updating the price
-            S[t]=S[t-1]*np.exp((self.r-0.5*self.sigma**2)*self.dt + (self.sigma*np.sqrt(self.dt)*Z))
+        S_t=np.full(paths,float(self.S_O))
+        states={name: payoff.start(S_t) for name,payoff in self.payoffs.items()}
+        # Bumped copies of every payoff state, keyed (name, bump), for the payoff Greeks
+        bumps=self._bumps() if self.greek_estimator is not None and self.payoffs else {}
+        for bump,(spot_factor,sigma) in bumps.items():
+            for name,payoff in self.payoffs.items():
+                states[(name,bump)]=payoff.start(spot_factor*S_t)
+        for t in range(1,self.num_of_steps+1):
+            S_t*=np.exp(drift+diffusion*normals())
+            for name,payoff in self.payoffs.items():
+                payoff.update(states[name],S_t)
+            for bump,(spot_factor,sigma) in bumps.items():
+                S_bumped=self._bumped_prices(S_t,t*self.dt,spot_factor,sigma)
+                for name,payoff in self.payoffs.items():
+                    payoff.update(states[(name,bump)],S_bumped)
+            if self.simulation_results_S is not None and last>first:
+                self.simulation_results_S[t,first:last]=S_t[:last-first]
+        self.number_of_paths_simulated+=paths
+        return S_t,states
 
-        self.simulation_results_S=S
+    def _new_statistics(self):
+        names=['call','put']
+        if self.greek_estimator is not None:
+            names+=[f'{option}_{greek}' for option in ('call','put') for greek in GREEKS]
+        if self.control_variate_means is not None:
+            names.append(TERMINAL)
+        names+=list(self.payoffs)
+        if self.greek_estimator is not None:
+            names+=[f'{name}_{greek}' for name in self.payoffs for greek in GREEKS]
+        return {name: _PayoffStatistics() for name in names}
+
+    def _payoff(self, S_T, option):
+        discount=np.exp(-self.r*self.T)
+        if option=='call':
+            return discount*np.maximum(S_T-self.K,0)
+        return discount*np.maximum(self.K-S_T,0)
+
+    def _discounted_payoffs(self, S_T, states):
+        """
+            Discounted payoff samples of both options and of every registered payoff, plus per-path Greek samples
+            of all of them when Greeks are requested.
+        """
+        payoffs={option: self._payoff(S_T,option) for option in ('call','put')}
+        if self.greek_estimator is not None:
+            for option in ('call','put'):
+                for greek,samples in self._greek_samples(S_T,option,payoffs[option]).items():
+                    payoffs[f'{option}_{greek}']=samples
+        discount=np.exp(-self.r*self.T)
+        if self.control_variate_means is not None:
+            payoffs[TERMINAL]=discount*S_T
+        for name,payoff in self.payoffs.items():
+            payoffs[name]=discount*payoff.value(states[name],S_T)
+            if self.greek_estimator is not None:
+                for greek,samples in self._payoff_greek_samples(name,payoff,states,S_T,payoffs[name]).items():
+                    payoffs[f'{name}_{greek}']=samples
+        return payoffs
+
+    def _control_name(self, name):
+        """
+            Statistic whose samples serve as control variate for `name`: the discounted terminal price for the
+            vanillas, the vanilla of the same type for registered payoffs, and `name` itself (no control) otherwise.
+        """
+        payoff=self.payoffs.get(name)
+        if payoff is not None:
+            return payoff.option
+        if name in ('call','put') and self.control_variate_means is not None:
+            return TERMINAL
+        return name
+
+    def _add_samples(self, samples):
+        for name,y in samples.items():
+            self.statistics[name].add(y,samples[self._control_name(name)])
+
+    def _greek_samples(self, S_T, option, payoff):
+        S0,sigma,T=float(self.S_O),self.sigma,self.T
+        sqrt_T=np.sqrt(T)
+        # Standardised terminal Brownian increment; every GBM path is a function of it alone
+        log_return=np.log(S_T/S0)
+        Z=(log_return-(self.r-0.5*sigma**2)*T)/(sigma*sqrt_T)
+
+        if self.greek_estimator=='likelihood_ratio':
+            return {'delta': payoff*Z/(S0*sigma*sqrt_T),
+                    'gamma': payoff*(Z**2-1-Z*sigma*sqrt_T)/(S0**2*sigma**2*T),
+                    'vega': payoff*((Z**2-1)/sigma-Z*sqrt_T)}
+
+        if self.greek_estimator=='pathwise':
+            discount=np.exp(-self.r*T)
+            phi=1.0 if option=='call' else -1.0
+            in_the_money=phi*(S_T-self.K)>0
+            # dS_T/dS0 = S_T/S0 and dS_T/dsigma = S_T * (log(S_T/S0) - (r + sigma^2/2) T) / sigma
+            exercised=np.where(in_the_money,phi*discount*S_T,0.0)
+            return {'delta': exercised/S0,
+                    'gamma': exercised/S0**2*(Z/(sigma*sqrt_T)-1),
+                    'vega': exercised*(log_return-(self.r+0.5*sigma**2)*T)/sigma}
+
+        h=self.bump_size
+        W_T=Z*sqrt_T
+
+        def revalue(spot_factor, bumped_sigma):
+            return self._payoff(spot_factor*S0*np.exp((self.r-0.5*bumped_sigma**2)*T+bumped_sigma*W_T),option)
+        up,down=self._payoff(S_T*(1+h),option),self._payoff(S_T*(1-h),option)
+        return {'delta': (up-down)/(2*h*S0),
+                'gamma': (up-2*payoff+down)/(h*S0)**2,
+                'vega': (revalue(1.0,sigma*(1+h))-revalue(1.0,sigma*(1-h)))/(2*h*sigma)}
+
+    def _bumps(self):
+        """(spot factor, volatility) of the bumped scenarios that registered payoffs are revalued in."""
+        h=self.bump_size
+        return {'spot_up': (1+h,self.sigma), 'spot_down': (1-h,self.sigma),
+                'sigma_up': (1.0,self.sigma*(1+h)), 'sigma_down': (1.0,self.sigma*(1-h))}
+
+    def _bumped_prices(self, S_t, t, spot_factor, sigma):
+        """Prices at time t of the same paths started at spot_factor * spot with volatility sigma."""
+        if sigma==self.sigma:
+            return spot_factor*S_t
+        S0=float(self.S_O)
+        # sigma * W_t of each path, recovered from its price
+        diffusion=np.log(S_t/S0)-(self.r-0.5*self.sigma**2)*t
+        return spot_factor*S0*np.exp((self.r-0.5*sigma**2)*t+sigma/self.sigma*diffusion)
+
+    def _payoff_greek_samples(self, name, payoff, states, S_T, value):
+        """Central-difference delta, gamma and vega samples of a registered payoff from its bumped states."""
+        discount=np.exp(-self.r*self.T)
+        bumped={bump: discount*payoff.value(states[(name,bump)],self._bumped_prices(S_T,self.T,spot_factor,sigma))
+                for bump,(spot_factor,sigma) in self._bumps().items()}
+        h=self.bump_size
+        S0=float(self.S_O)
+        return {'delta': (bumped['spot_up']-bumped['spot_down'])/(2*h*S0),
+                'gamma': (bumped['spot_up']-2*value+bumped['spot_down'])/(h*S0)**2,
+                'vega': (bumped['sigma_up']-bumped['sigma_down'])/(2*h*self.sigma)}
+
+    def _target_reached(self, target_standard_error):
+        if target_standard_error is None:
+            return False
+        return all(self.standard_error(name)<=target_standard_error for name in self.target_statistics)
+
+    def _estimate(self, option):
+        control_mean=None if self.control_variate_means is None else \
+            self.control_variate_means.get(self._control_name(option))
+        return self.statistics[option].estimate(control_mean)
+
+    def standard_error(self, option):
+        """Standard error of the last simulation's 'call' or 'put' price, or of another statistic like 'call_delta'."""
+        return self._estimate(option)[1]
+
+    def calculate_price_statistics(self, option_type, confidence_level=0.95):
+        """Returns the price, its standard error and a normal confidence interval for the last simulation."""
+        if self.statistics is None:
+            return -1
+        option='call' if option_type==OPTION_TYPE.CALL_OPTION.value else 'put'
+        return self._price_statistics(option,confidence_level)
+
+    def calculate_payoff_price(self, name):
+        """Price of the payoff registered as `name` from the last simulation, -1 if it was not simulated."""
+        if self.statistics is None or name not in self.payoffs or name not in self.statistics:
+            return -1
+        return self._estimate(name)[0]
+
+    def calculate_payoff_statistics(self, name=None, confidence_level=0.95):
+        """
+            Price statistics, as in calculate_price_statistics, of the payoff registered as `name`, or a DataFrame
+            with one row per registered payoff when name is None.
+        """
+        if self.statistics is None:
+            return -1
+        if name is not None:
+            if name not in self.payoffs or name not in self.statistics:
+                return -1
+            return self._price_statistics(name,confidence_level)
+        import pandas as pd
+
+        rows={name: self._price_statistics(name,confidence_level) for name in self.payoffs if name in self.statistics}
+        return pd.DataFrame.from_dict(rows,orient='index')
+
+    def _price_statistics(self, option, confidence_level):
+        price,standard_error=self._estimate(option)
+        half_width=ndtri(0.5+0.5*confidence_level)*standard_error
+        return {'price': price,
+                'standard_error': standard_error,
+                'confidence_interval': (price-half_width,price+half_width),
+                'number_of_paths': self.number_of_paths_simulated}
+
+    def calculate_greeks(self, option_type):
+        """
+            Returns the price, delta, gamma and vega of the last simulation, estimated with the estimator passed to
+            simulate_price(greeks=...), and a 'standard_errors' dict with the standard error of each of them.
+            Vega is per unit of volatility, as in BlackScholesModel.calculate_greeks.
+        """
+        if self.statistics is None:
+            return -1
+        if self.greek_estimator is None:
+            raise ValueError("No Greeks were estimated, run simulate_price(greeks=...) first")
+        option='call' if option_type==OPTION_TYPE.CALL_OPTION.value else 'put'
+        return self._greeks(option)
+
+    def calculate_payoff_greeks(self, name):
+        """
+            Greeks, as in calculate_greeks, of the payoff registered as `name`, from bump revaluation on the same
+            paths whatever the estimator passed to simulate_price; -1 if it was not simulated.
+        """
+        if self.statistics is None or name not in self.payoffs or name not in self.statistics:
+            return -1
+        if self.greek_estimator is None:
+            raise ValueError("No Greeks were estimated, run simulate_price(greeks=...) first")
+        return self._greeks(name)
+
+    def _greeks(self, option):
+        names={'price': option, **{greek: f'{option}_{greek}' for greek in GREEKS}}
+        estimates={name: self._estimate(statistic) for name,statistic in names.items()}
+        result={name: estimate for name,(estimate,_) in estimates.items()}
+        result['standard_errors']={name: standard_error for name,(_,standard_error) in estimates.items()}
+        return result
 
     def _calculate_call_option_price(self):
 
-        if self.simulation_results_S is None:
+        if self.statistics is None:
             return -1
-        return np.exp(-self.r*self.T)*1/self.N*np.sum(np.maximum(self.simulation_results_S[-1]-self.K,0))
+        return self._estimate('call')[0]
 
     def _calculate_put_option_price(self):
 
-        if self.simulation_results_S is None:
+        if self.statistics is None:
             return -1
-        return np.exp(-self.r * self.T) * 1 / self.N * np.sum(np.maximum(self.K - self.simulation_results_S[-1], 0))
+        return self._estimate('put')[0]
 
     def plot_simulation_results(self, num_of_movements):
         """Plots specified number of simulated price movements."""
+        if self.simulation_results_S is None:
+            raise ValueError("No stored paths to plot, run simulate_price(store_paths=True) first")
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 8))
         plt.plot(self.simulation_results_S[:, 0:num_of_movements])
         plt.axhline(self.K, c='k', xmin=0, xmax=self.num_of_steps, label='Strike Price')
@@ -67,6 +632,14 @@ class MonteCarloPricing(OptionPricingModel):
         plt.show()
 
 
-
-
-
+def _simulate_worker(model, rng, modes, chunk_size, size, quasi_random, points_per_replication):
+    """Runs one worker's share on a private copy of the model; returns its statistics, path count and stream."""
+    worker=copy.copy(model)
+    worker.statistics=worker._new_statistics()
+    worker.simulation_results_S=None
+    worker.number_of_paths_simulated=0
+    if quasi_random:
+        worker._simulate_quasi_random(rng,modes,chunk_size,None,size,points_per_replication)
+    else:
+        worker._simulate_pseudo_random(rng,modes,chunk_size,None,size)
+    return worker.statistics,worker.number_of_paths_simulated,rng
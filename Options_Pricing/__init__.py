@@ -0,0 +1,43 @@
+"""
+    Option pricing models and market data helpers.
+    The names below can be imported straight from the package, e.g.
+        from Options_Pricing import BlackScholesModel, OPTION_TYPE
+    Each one is loaded from its module on first access, so importing the package, or one pricer, does not pull in
+    plotting, network or statistics libraries that the caller never uses.
+"""
+import importlib
+
+_EXPORTS = {
+    'OPTION_TYPE': 'base',
+    'EXERCISE_STYLE': 'base',
+    'OptionPricingModel': 'base',
+    'BlackScholesModel': 'Black_Scholes_Model',
+    'BinomialTreePricing': 'BinomialTreemodel',
+    'TREE_METHOD': 'BinomialTreemodel',
+    'MonteCarloPricing': 'MonteCarloSimulation',
+    'FiniteDifferencePricing': 'FiniteDifferenceModel',
+    'PricingCache': 'cache',
+    'VasicekProcess': 'vasicek',
+    'AsianPayoff': 'exotic_payoffs',
+    'BarrierPayoff': 'exotic_payoffs',
+    'LookbackPayoff': 'exotic_payoffs',
+    'EuropeanPayoff': 'exotic_payoffs',
+    'AVERAGE_TYPE': 'exotic_payoffs',
+    'BARRIER_TYPE': 'exotic_payoffs',
+    'HistoryStore': 'history_store',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{module}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
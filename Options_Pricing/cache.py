@@ -0,0 +1,142 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from numbers import Number
+
+import numpy as np
+
+from Options_Pricing import instrumentation
+
+# Attributes models fill in while pricing (including simulate_price settings, which reach the key through its
+# arguments instead), or derive from their inputs; they are left out of keys
+_STATE_ATTRIBUTES = {'number_of_paths_simulated', 'simulation_results_S', 'statistics', 'control_variate_means',
+                     'greek_estimator', 'bump_size', 'target_statistics', 'payoffs', 'S_grid'}
+
+
+def _quantise(value, significant_digits):
+    if isinstance(value, (bool, np.bool_)) or not isinstance(value, Number):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return float(f'{float(value):.{significant_digits}g}')
+
+
+class PricingCache:
+    """
+        Memoises calculate_option_price across model instances with identical inputs.
+        Keys are the model class, the option type, every scalar input of the model (S, K, T, r, sigma, steps,
+        paths, exercise style, ...) rounded to significant_digits, and for Monte Carlo the simulate_price
+        arguments such as the seed. Entries live in a bounded in-memory LRU and expire ttl seconds after they were
+        computed (never, with ttl=None). With path set, results are also shared through a SQLite file, so worker
+        processes reuse each other's tree and Monte Carlo prices.
+    """
+    def __init__(self, max_entries=4096, ttl=None, significant_digits=10, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.significant_digits = significant_digits
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if path is not None:
+            self._execute('CREATE TABLE IF NOT EXISTS prices (key TEXT PRIMARY KEY, price REAL, created REAL)')
+
+    def _execute(self, statement, parameters=()):
+        """Runs one statement on a fresh connection, so the cache can be shared by threads and processes."""
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                return connection.execute(statement, parameters).fetchone()
+        finally:
+            connection.close()
+
+    def key(self, model, option_type, simulation=None):
+        """Cache key for pricing model, or None when it holds array inputs (a batch), which are not cached."""
+        inputs = {}
+        for name, value in sorted(vars(model).items()):
+            if name in _STATE_ATTRIBUTES:
+                continue
+            if isinstance(value, np.ndarray):
+                if value.ndim:
+                    return None
+                value = value.item()
+            if isinstance(value, (Number, str)) or value is None:
+                inputs[name] = _quantise(value, self.significant_digits)
+        simulation = {name: value for name, value in (simulation or {}).items() if name != 'executor'}
+        return json.dumps([type(model).__name__, option_type, inputs, simulation], sort_keys=True, default=str)
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    instrumentation.count('cache_hits')
+                    return entry[0]
+                del self.entries[key]
+        if self.path is not None:
+            row = self._execute('SELECT price, created FROM prices WHERE key = ?', (key,))
+            if row is not None and not self._expired(row[1]):
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, row[0], row[1])
+                instrumentation.count('cache_disk_hits')
+                return row[0]
+        with self._lock:
+            self.misses += 1
+        instrumentation.count('cache_misses')
+        return None
+
+    def _store(self, key, price, created):
+        self.entries[key] = (price, created)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _put(self, key, price):
+        created = time.time()
+        with self._lock:
+            self._store(key, price, created)
+        if self.path is not None:
+            self._execute('INSERT OR REPLACE INTO prices VALUES (?, ?, ?)', (key, price, created))
+
+    def calculate_option_price(self, model, option_type, **simulation):
+        """
+            Returns model.calculate_option_price(option_type), from the cache when the same inputs were priced
+            before. Monte Carlo models are simulated on a miss with simulate_price(**simulation); the keyword
+            arguments are part of the key, so different seeds or path budgets are cached separately.
+        """
+        key = self.key(model, option_type, simulation)
+        price = self._get(key) if key is not None else None
+        if price is not None:
+            return price
+        if hasattr(model, 'simulate_price'):
+            model.simulate_price(**simulation)
+        price = model.calculate_option_price(option_type)
+        # -1 flags an unknown option type or a failed run; it is returned but never cached
+        if key is not None and price != -1:
+            self._put(key, float(price))
+        return price
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'entries': len(self.entries),
+                    'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0}
+
+    def clear(self):
+        """Empties the in-memory tier and resets the counters; the on-disk tier is kept."""
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
@@ -0,0 +1,12 @@
+from Options_Pricing.cache import PricingCache
+from Options_Pricing.FiniteDifferenceModel import FiniteDifferencePricing
+
+
+def test_finite_difference_grids_get_distinct_keys():
+    # Both pairs put the spot on node 95 with the same spacing, so only the grid size and range tell them apart
+    cache = PricingCache()
+    for wide, narrow in (((400, 4.0), (200, 2.0)), ((400, 4.0), (800, 8.0))):
+        models = [FiniteDifferencePricing(100, 105, 200, 0.04, 0.3, number_of_spot_steps=steps, spot_range=spot_range)
+                  for steps, spot_range in (wide, narrow)]
+        assert models[0].spot_index == models[1].spot_index and models[0].dS == models[1].dS
+        assert cache.key(models[0], 'Put Option') != cache.key(models[1], 'Put Option')
@@ -0,0 +1,158 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Options_Pricing import instrumentation
+from Options_Pricing import ticker as ticker_data
+from Options_Pricing.Black_Scholes_Model import BlackScholesModel
+from Options_Pricing.base import OPTION_TYPE
+
+GREEKS = ('price', 'delta', 'gamma', 'theta', 'vega', 'rho')
+
+
+class YFinanceChainSource:
+    """Live option chains and underlying history for one ticker from yfinance."""
+    def __init__(self, ticker, history_period='6mo'):
+        import yfinance as yf
+
+        self.ticker = ticker
+        self.history_period = history_period
+        self._ticker = yf.Ticker(ticker)
+
+    def expirations(self):
+        return list(self._ticker.options)
+
+    def option_chain(self, expiration):
+        """Returns (calls, puts) DataFrames for one expiration date."""
+        chain = self._ticker.option_chain(expiration)
+        return chain.calls, chain.puts
+
+    def history(self):
+        import yfinance as yf
+
+        return yf.download(self.ticker, period=self.history_period, progress=False)
+
+
+class SnapshotChainSource:
+    """
+    Option chains saved by save_snapshot, read back from disk, so the analysis runs offline and reproducibly.
+    The directory holds expirations.json, history.csv and calls_<expiration>.csv / puts_<expiration>.csv.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+
+    def expirations(self):
+        with open(os.path.join(self.directory, 'expirations.json')) as f:
+            return json.load(f)
+
+    def option_chain(self, expiration):
+        return (pd.read_csv(os.path.join(self.directory, f'calls_{expiration}.csv')),
+                pd.read_csv(os.path.join(self.directory, f'puts_{expiration}.csv')))
+
+    def history(self):
+        return pd.read_csv(os.path.join(self.directory, 'history.csv'), index_col=0, parse_dates=True)
+
+
+def save_snapshot(source, directory, expirations=None, max_workers=8):
+    """Saves the history and the chains of every (or the given) expiration of source for SnapshotChainSource."""
+    os.makedirs(directory, exist_ok=True)
+    expirations = source.expirations() if expirations is None else list(expirations)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        chains = list(pool.map(source.option_chain, expirations))
+    for expiration, (calls, puts) in zip(expirations, chains):
+        calls.to_csv(os.path.join(directory, f'calls_{expiration}.csv'), index=False)
+        puts.to_csv(os.path.join(directory, f'puts_{expiration}.csv'), index=False)
+    history = source.history()
+    history = history.copy()
+    if isinstance(history.columns, pd.MultiIndex):
+        history.columns = history.columns.get_level_values(0)
+    history.to_csv(os.path.join(directory, 'history.csv'))
+    with open(os.path.join(directory, 'expirations.json'), 'w') as f:
+        json.dump(expirations, f)
+
+
+def fetch_chain(source, expirations=None, max_workers=8):
+    """
+    Fetches the chains of every (or the given) expiration concurrently and stacks calls and puts of all of them
+    into one table, with 'expiration' and 'option_type' (OPTION_TYPE values) columns added.
+    """
+    expirations = source.expirations() if expirations is None else list(expirations)
+    with instrumentation.span('fetch_chain', 'network', expirations=len(expirations)):
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            chains = list(pool.map(source.option_chain, expirations))
+
+    frames = []
+    for expiration, (calls, puts) in zip(expirations, chains):
+        for option_type, frame in ((OPTION_TYPE.CALL_OPTION.value, calls), (OPTION_TYPE.PUT_OPTION.value, puts)):
+            if len(frame):
+                frames.append(frame.assign(expiration=pd.Timestamp(expiration), option_type=option_type))
+    if not frames:
+        return pd.DataFrame(columns=['expiration', 'option_type', 'strike'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def last_close(history, column='Close'):
+    """(valuation date, spot) from the last row of an underlying history DataFrame."""
+    close = ticker_data.get_column(history, column).dropna()
+    return pd.Timestamp(close.index[-1]), float(close.iloc[-1])
+
+
+def analyze_chain(chain, spot, valuation_date, risk_free_rate, sigma_column='impliedVolatility',
+                  price_column='lastPrice'):
+    """
+    Prices every contract of a chain table in one vectorized Black-Scholes pass with the contract's own implied
+    volatility. Adds 'days_to_maturity', 'model_<greek>' columns for price and Greeks, and 'mispricing' (market
+    minus model price) and 'relative_mispricing' columns. Contracts that have expired or carry no volatility
+    are left as NaN.
+    """
+    analysis = chain.copy()
+    days = (pd.to_datetime(analysis['expiration']) - pd.Timestamp(valuation_date).normalize()).dt.days
+    analysis['days_to_maturity'] = days.to_numpy(dtype=np.float64)
+    sigma = analysis[sigma_column].to_numpy(dtype=np.float64)
+    valid = (analysis['days_to_maturity'].to_numpy() > 0) & (sigma > 0)
+
+    greeks = BlackScholesModel.calculate_greeks(spot, analysis['strike'].to_numpy(dtype=np.float64)[valid],
+                                                analysis['days_to_maturity'].to_numpy()[valid], risk_free_rate,
+                                                sigma[valid], analysis['option_type'].to_numpy()[valid])
+    for greek in GREEKS:
+        column = np.full(len(analysis), np.nan)
+        column[valid] = greeks[greek]
+        analysis[f'model_{greek}'] = column
+
+    market = analysis[price_column].to_numpy(dtype=np.float64)
+    analysis['mispricing'] = market - analysis['model_price'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        analysis['relative_mispricing'] = analysis['mispricing'].to_numpy() / analysis['model_price'].to_numpy()
+    if {'bid', 'ask'} <= set(analysis.columns):
+        analysis['model_within_spread'] = ((analysis['model_price'] >= analysis['bid']) &
+                                           (analysis['model_price'] <= analysis['ask']))
+    return analysis
+
+
+def mispricing_statistics(analysis, by=('expiration', 'option_type')):
+    """Count, mean, median, mean absolute and root mean square mispricing per group of the analysed chain."""
+    priced = analysis.dropna(subset=['mispricing']).assign(
+        absolute_mispricing=lambda frame: frame['mispricing'].abs(),
+        squared_mispricing=lambda frame: frame['mispricing'] ** 2)
+    aggregations = {'contracts': ('mispricing', 'size'), 'mean_mispricing': ('mispricing', 'mean'),
+                    'median_mispricing': ('mispricing', 'median'),
+                    'mean_absolute_mispricing': ('absolute_mispricing', 'mean'),
+                    'rms_mispricing': ('squared_mispricing', 'mean')}
+    if 'model_within_spread' in priced.columns:
+        aggregations['share_within_spread'] = ('model_within_spread', 'mean')
+    statistics = priced.groupby(list(by)).agg(**aggregations)
+    statistics['rms_mispricing'] = np.sqrt(statistics['rms_mispricing'])
+    return statistics
+
+
+def analyze(source, risk_free_rate, expirations=None, max_workers=8, **columns):
+    """Fetches the whole chain and the underlying history from source and returns analyze_chain's table."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # The history download overlaps with the chain fetches
+        history = pool.submit(source.history)
+        chain = fetch_chain(source, expirations, max_workers)
+        valuation_date, spot = last_close(history.result())
+    return analyze_chain(chain, spot, valuation_date, risk_free_rate, **columns)
@@ -0,0 +1,141 @@
+from abc import ABC, abstractmethod
+from enum import Enum
+
+import numpy as np
+
+from Options_Pricing.base import OPTION_TYPE
+
+
+class AVERAGE_TYPE(Enum):
+    ARITHMETIC='Arithmetic'
+    GEOMETRIC='Geometric'
+
+
+class BARRIER_TYPE(Enum):
+    UP_AND_OUT='Up-and-Out'
+    DOWN_AND_OUT='Down-and-Out'
+    UP_AND_IN='Up-and-In'
+    DOWN_AND_IN='Down-and-In'
+
+
+class PathPayoff(ABC):
+    """
+        Payoff of one simulated path, evaluated from a running state instead of the stored path.
+        MonteCarloPricing calls start once with the spot prices of a chunk of paths, update after every time step
+        with the new prices, and value with the terminal prices; the state is a dict of per-path arrays that
+        update modifies in place. Payoffs keep no state of their own, so one instance can be shared by chunks,
+        workers and models. value returns the undiscounted payoff of every path.
+    """
+    def __init__(self, option_type):
+        if option_type not in (OPTION_TYPE.CALL_OPTION.value, OPTION_TYPE.PUT_OPTION.value):
+            raise ValueError(f"Unknown option type {option_type!r}")
+        self.option_type=option_type
+        self.phi=1.0 if option_type==OPTION_TYPE.CALL_OPTION.value else -1.0
+
+    @property
+    def option(self):
+        """'call' or 'put', the vanilla payoff used as control variate."""
+        return 'call' if self.phi>0 else 'put'
+
+    def start(self, S_0):
+        return {}
+
+    def update(self, state, S_t):
+        pass
+
+    @abstractmethod
+    def value(self, state, S_T):
+        pass
+
+
+class EuropeanPayoff(PathPayoff):
+    """Vanilla payoff max(phi * (S_T - K), 0) at any strike."""
+    def __init__(self, strike_price, option_type):
+        super().__init__(option_type)
+        self.K=strike_price
+
+    def value(self, state, S_T):
+        return np.maximum(self.phi*(S_T-self.K),0.0)
+
+
+class AsianPayoff(PathPayoff):
+    """
+        Average-price option on the arithmetic or geometric mean of the prices at every time step after the
+        start, max(phi * (A - K), 0). The state is the running sum of prices (or of log prices) and their count.
+    """
+    def __init__(self, strike_price, option_type, average_type=AVERAGE_TYPE.ARITHMETIC.value):
+        super().__init__(option_type)
+        if average_type not in (AVERAGE_TYPE.ARITHMETIC.value, AVERAGE_TYPE.GEOMETRIC.value):
+            raise ValueError(f"Unknown average type {average_type!r}")
+        self.K=strike_price
+        self.geometric=average_type==AVERAGE_TYPE.GEOMETRIC.value
+
+    def start(self, S_0):
+        return {'sum': np.zeros(np.shape(S_0)), 'count': 0}
+
+    def update(self, state, S_t):
+        state['sum']+=np.log(S_t) if self.geometric else S_t
+        state['count']+=1
+
+    def value(self, state, S_T):
+        average=state['sum']/max(state['count'],1)
+        if self.geometric:
+            average=np.exp(average)
+        return np.maximum(self.phi*(average-self.K),0.0)
+
+
+class BarrierPayoff(PathPayoff):
+    """
+        Knock-in or knock-out European option. The barrier is monitored at the start and after every time step
+        (daily, on the model's grid), so prices sit slightly above continuously monitored knock-out prices.
+        The state is a per-path flag of whether the barrier has been touched. rebate is paid at maturity on paths
+        that end up knocked out (or never knocked in).
+    """
+    def __init__(self, strike_price, option_type, barrier, barrier_type, rebate=0.0):
+        super().__init__(option_type)
+        if barrier_type not in [member.value for member in BARRIER_TYPE]:
+            raise ValueError(f"Unknown barrier type {barrier_type!r}")
+        self.K=strike_price
+        self.barrier=barrier
+        self.up=barrier_type.startswith('Up')
+        self.knock_in=barrier_type.endswith('In')
+        self.rebate=rebate
+
+    def _touched(self, S_t):
+        return S_t>=self.barrier if self.up else S_t<=self.barrier
+
+    def start(self, S_0):
+        return {'touched': np.broadcast_to(self._touched(np.asarray(S_0,dtype=np.float64)),np.shape(S_0)).copy()}
+
+    def update(self, state, S_t):
+        state['touched']|=self._touched(S_t)
+
+    def value(self, state, S_T):
+        alive=state['touched'] if self.knock_in else ~state['touched']
+        return np.where(alive,np.maximum(self.phi*(S_T-self.K),0.0),self.rebate)
+
+
+class LookbackPayoff(PathPayoff):
+    """
+        Lookback option on the extremes of the prices at the start and every time step. Without a strike it is
+        the floating-strike option, S_T - min for a call and max - S_T for a put; with one it is the fixed-strike
+        option, max(max - K, 0) for a call and max(K - min, 0) for a put. The state is the running max and min.
+    """
+    def __init__(self, option_type, strike_price=None):
+        super().__init__(option_type)
+        self.K=strike_price
+
+    def start(self, S_0):
+        S_0=np.asarray(S_0,dtype=np.float64)
+        return {'max': S_0.copy(), 'min': S_0.copy()}
+
+    def update(self, state, S_t):
+        np.maximum(state['max'],S_t,out=state['max'])
+        np.minimum(state['min'],S_t,out=state['min'])
+
+    def value(self, state, S_T):
+        if self.K is None:
+            return S_T-state['min'] if self.phi>0 else state['max']-S_T
+        if self.phi>0:
+            return np.maximum(state['max']-self.K,0.0)
+        return np.maximum(self.K-state['min'],0.0)
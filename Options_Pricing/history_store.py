@@ -0,0 +1,128 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class HistoryStore:
+    """
+        On-disk columnar store for daily OHLCV history, one directory per symbol:
+            dates.npy     int64 nanosecond timestamps, one per bar
+            values.npy    float64 matrix with one column per field
+            columns.json  field names for the columns of values.npy
+        Reads memory-map the .npy files, so loading a symbol is zero-copy and does not parse anything.
+    """
+    def __init__(self, root):
+        self.root=root
+        os.makedirs(root,exist_ok=True)
+
+    def _path(self, symbol):
+        return os.path.join(self.root,symbol.replace(os.sep,'_'))
+
+    def symbols(self):
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root,name)))
+
+    def contains(self, symbol):
+        return os.path.exists(os.path.join(self._path(symbol),'columns.json'))
+
+    def write(self, symbol, data):
+        """Replaces the stored history of symbol with a DataFrame indexed by date."""
+        path=self._path(symbol)
+        os.makedirs(path,exist_ok=True)
+        columns=[str(column) for column in _flatten_columns(data.columns)]
+        dates=pd.DatetimeIndex(data.index).as_unit('ns').asi8
+        # Columns are written last: a symbol only counts as stored once all three files exist
+        np.save(os.path.join(path,'dates.npy'),dates)
+        np.save(os.path.join(path,'values.npy'),np.ascontiguousarray(data.to_numpy(dtype=np.float64)))
+        with open(os.path.join(path,'columns.json'),'w') as f:
+            json.dump(columns,f)
+
+    def last_date(self, symbol):
+        """Timestamp of the last stored bar of symbol, or None if nothing is stored."""
+        arrays=self.read_arrays(symbol)
+        if arrays is None or len(arrays[0])==0:
+            return None
+        return pd.Timestamp(int(arrays[0][-1]))
+
+    def append(self, symbol, data):
+        """
+            Appends bars to the stored history of symbol in place, writing only the new rows.
+            Bars dated on or before the last stored bar replace the stored tail from their first date onwards
+            (e.g. a partial bar fetched intraday). Raises ValueError if the columns differ from the stored ones,
+            in which case the caller should rewrite the symbol instead.
+        """
+        if not self.contains(symbol):
+            self.write(symbol,data)
+            return
+        dates,_,columns=self.read_arrays(symbol)
+        if [str(column) for column in _flatten_columns(data.columns)]!=columns:
+            raise ValueError(f"Columns of new bars for {symbol} do not match the stored columns")
+        new_dates=pd.DatetimeIndex(data.index).as_unit('ns').asi8
+        keep=int(np.searchsorted(dates,new_dates[0])) if len(new_dates) else len(dates)
+        del dates
+
+        path=self._path(symbol)
+        _write_rows(os.path.join(path,'dates.npy'),new_dates,keep)
+        _write_rows(os.path.join(path,'values.npy'),np.ascontiguousarray(data.to_numpy(dtype=np.float64)),keep)
+
+    def read_arrays(self, symbol):
+        """Returns (dates, values, columns) with dates and values memory-mapped from disk, or None if not stored."""
+        if not self.contains(symbol):
+            return None
+        path=self._path(symbol)
+        with open(os.path.join(path,'columns.json')) as f:
+            columns=json.load(f)
+        dates=np.load(os.path.join(path,'dates.npy'),mmap_mode='r')
+        values=np.load(os.path.join(path,'values.npy'),mmap_mode='r')
+        return dates,values,columns
+
+    def read(self, symbol):
+        """Returns the stored history of symbol as a DataFrame over the memory-mapped values, or None."""
+        arrays=self.read_arrays(symbol)
+        if arrays is None:
+            return None
+        dates,values,columns=arrays
+        index=pd.DatetimeIndex(np.asarray(dates).view('datetime64[ns]'),name='Date')
+        return pd.DataFrame(values,index=index,columns=columns,copy=False)
+
+
+def _flatten_columns(columns):
+    """yfinance returns (field, ticker) MultiIndex columns for single symbols; keep only the field level."""
+    if isinstance(columns,pd.MultiIndex):
+        return columns.get_level_values(0)
+    return columns
+
+
+def _write_rows(filename, rows, keep):
+    """
+        Truncates the .npy array in filename to its first `keep` rows and appends `rows`, rewriting only the header
+        and the new bytes. np.save pads headers so the row count can grow in place; should the new header still not
+        fit, the file is rewritten whole.
+    """
+    with open(filename,'r+b') as f:
+        version=np.lib.format.read_magic(f)
+        read_header=np.lib.format.read_array_header_1_0 if version==(1,0) else np.lib.format.read_array_header_2_0
+        shape,fortran_order,dtype=read_header(f)
+        header_length=f.tell()
+        row_items=int(np.prod(shape[1:],dtype=np.int64))
+
+        header=io.BytesIO()
+        header_fields={'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': fortran_order,
+                       'shape': (keep+rows.shape[0],)+tuple(shape[1:])}
+        np.lib.format.write_array_header_2_0(header,header_fields) if version==(2,0) else \
+            np.lib.format.write_array_header_1_0(header,header_fields)
+
+        if len(header.getvalue())!=header_length:
+            stored=np.fromfile(f,dtype=dtype,count=keep*row_items).reshape((keep,)+tuple(shape[1:]))
+            f.seek(0)
+            f.truncate()
+            np.lib.format.write_array(f,np.concatenate([stored,rows.astype(dtype,copy=False)]))
+            return
+
+        f.seek(0)
+        f.write(header.getvalue())
+        f.seek(header_length+keep*row_items*dtype.itemsize)
+        f.write(np.ascontiguousarray(rows,dtype=dtype).tobytes())
+        f.truncate()
@@ -0,0 +1,133 @@
+import numpy as np
+from scipy.special import ndtr
+
+from Options_Pricing import instrumentation
+from Options_Pricing.Black_Scholes_Model import _broadcast_contracts
+
+# Per-contract convergence status returned next to the implied volatilities
+CONVERGED = 0
+MAX_ITERATIONS_REACHED = 1
+BELOW_INTRINSIC_VALUE = 2
+ABOVE_UPPER_BOUND = 3
+BRACKET_EXHAUSTED = 4
+
+SIGMA_LOWER_BOUND = 1e-6
+SIGMA_UPPER_BOUND = 10.0
+
+
+def _price_vega_volga(S, K, T, r, sigma, phi):
+    """Black-Scholes price with the first two volatility derivatives, sharing d1/d2."""
+    sqrt_T = np.sqrt(T)
+    sigma_sqrt_T = sigma * sqrt_T
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / sigma_sqrt_T
+    d2 = d1 - sigma_sqrt_T
+    price = phi * (S * ndtr(phi * d1) - K * np.exp(-r * T) * ndtr(phi * d2))
+    vega = S * np.exp(-0.5 * d1 ** 2) / np.sqrt(2 * np.pi) * sqrt_T
+    volga = vega * d1 * d2 / sigma
+    return price, vega, volga
+
+
+def _initial_guess(call_price, S, discounted_K, T):
+    """
+        Corrado-Miller rational approximation, which is accurate near the money.
+        Where its square root turns negative (far from the money) Brenner-Subrahmanyam is used instead.
+    """
+    half_moneyness = 0.5 * (S - discounted_K)
+    excess = call_price - half_moneyness
+    radicand = excess ** 2 - (S - discounted_K) ** 2 / np.pi
+    corrado_miller = np.sqrt(2 * np.pi) / (S + discounted_K) * (excess + np.sqrt(np.maximum(radicand, 0.0))) / np.sqrt(T)
+    brenner_subrahmanyam = np.sqrt(2 * np.pi / T) * call_price / S
+    guess = np.where(radicand > 0, corrado_miller, brenner_subrahmanyam)
+    guess = np.where(np.isfinite(guess), guess, 0.2)
+    return np.clip(guess, 1e-3, 5.0)
+
+
+@instrumentation.timed('implied_volatility')
+def implied_volatility(option_price, underlying_spot_price, strike_price, days_to_maturity, risk_free_rate, option_type,
+                       tolerance=1e-10, max_iterations=50):
+    """
+        Backs out Black-Scholes implied volatility for many quotes at once.
+        Arguments broadcast like BlackScholesModel.calculate_option_prices. Each contract starts from a rational
+        initial guess and takes Halley steps (Newton with a volga correction); a step that leaves the current
+        [lower, upper] volatility bracket, or lands where vega has vanished, is replaced by bisection, so every
+        contract keeps converging even where Newton would overshoot.
+        Returns (implied_vols, status), where status holds CONVERGED, MAX_ITERATIONS_REACHED,
+        BELOW_INTRINSIC_VALUE, ABOVE_UPPER_BOUND or BRACKET_EXHAUSTED per contract; contracts without a solution
+        get NaN. CONVERGED means the model price matches the quote to tolerance; BRACKET_EXHAUSTED means the
+        bracket shrank onto a volatility without such a match, typically SIGMA_UPPER_BOUND for a quote whose
+        volatility lies beyond it.
+    """
+    price, S, K, days, r, is_call = _broadcast_contracts(option_type, option_price, underlying_spot_price, strike_price,
+                                                         days_to_maturity, risk_free_rate)
+    phi = np.where(is_call, 1.0, -1.0)
+    T = days / 365
+    discounted_K = K * np.exp(-r * T)
+
+    sigma = np.full(price.shape, np.nan)
+    status = np.full(price.shape, MAX_ITERATIONS_REACHED, dtype=np.int8)
+
+    # No-arbitrage bounds: a quote outside them has no implied volatility
+    intrinsic = np.maximum(phi * (S - discounted_K), 0.0)
+    upper = np.where(phi > 0, S, discounted_K)
+    status[price <= intrinsic] = BELOW_INTRINSIC_VALUE
+    status[price >= upper] = ABOVE_UPPER_BOUND
+
+    active = np.flatnonzero(status == MAX_ITERATIONS_REACHED)
+    if active.size == 0:
+        return sigma, status
+
+    S_a, K_a, T_a, r_a, phi_a, target = (x.ravel()[active] for x in (S, K, T, r, phi, price))
+    forward_intrinsic = S_a - discounted_K.ravel()[active]
+    # In-the-money quotes are solved as the out-of-the-money option of the other type (put-call parity),
+    # whose price is all time value and so stays sensitive to sigma
+    in_the_money = phi_a * forward_intrinsic > 0
+    target = np.where(in_the_money, target - phi_a * forward_intrinsic, target)
+    phi_a = np.where(in_the_money, -phi_a, phi_a)
+
+    call_price = np.where(phi_a > 0, target, target + forward_intrinsic)
+    sig = _initial_guess(call_price, S_a, discounted_K.ravel()[active], T_a)
+    lower = np.full(active.size, SIGMA_LOWER_BOUND)
+    higher = np.full(active.size, SIGMA_UPPER_BOUND)
+
+    sigma_flat = sigma.ravel()
+    status_flat = status.ravel()
+    for _ in range(max_iterations):
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore', under='ignore'):
+            model_price, vega, volga = _price_vega_volga(S_a, K_a, T_a, r_a, sig, phi_a)
+        diff = model_price - target
+
+        # Price is increasing in sigma, so the sign of diff tells which side of the root we are on
+        too_high = diff > 0
+        higher = np.where(too_high, sig, higher)
+        lower = np.where(too_high, lower, sig)
+
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            newton = diff / vega
+            correction = 0.5 * newton * volga / vega
+            # Far from the root (where vega is vanishing) the Halley factor shrinks the step to nothing,
+            # so fall back to the plain Newton step and let the bracket check turn it into bisection
+            step = np.where(np.abs(correction) < 0.5, newton / (1.0 - correction), newton)
+            candidate = sig - step
+        use_bisection = ~np.isfinite(candidate) | (candidate < lower) | (candidate > higher)
+        new_sig = np.where(use_bisection, 0.5 * (lower + higher), candidate)
+
+        # A match is a price error within tolerance of the quote, or within what a relative volatility change of
+        # tolerance moves the price by; a bracket collapsed onto a bound stalls the step without either
+        price_matched = np.abs(diff) <= tolerance * np.maximum(target, np.nan_to_num(vega) * sig)
+        exhausted = ~price_matched & (np.abs(new_sig - sig) <= tolerance * sig)
+        done = price_matched | exhausted
+        sig = np.where(price_matched, sig, new_sig)
+
+        if np.any(done):
+            sigma_flat[active[price_matched]] = sig[price_matched]
+            status_flat[active[price_matched]] = CONVERGED
+            status_flat[active[exhausted]] = BRACKET_EXHAUSTED
+            keep = ~done
+            active, S_a, K_a, T_a, r_a, phi_a, target, sig, lower, higher = (
+                x[keep] for x in (active, S_a, K_a, T_a, r_a, phi_a, target, sig, lower, higher))
+            if active.size == 0:
+                break
+
+    # Whatever is left did not meet the tolerance; report the best estimate with its status
+    sigma_flat[active] = sig
+    return sigma_flat.reshape(price.shape), status_flat.reshape(price.shape)
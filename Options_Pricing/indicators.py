@@ -0,0 +1,170 @@
+import numpy as np
+from collections import deque
+
+from Options_Pricing.segment_tree import SparseTable
+
+
+def sliding_max(values, window):
+    """
+    Trailing-window maximum down axis 0 of a 2-D array, for every column at once.
+    Uses the van Herk/Gil-Werman split into blocks of `window` rows: a running max forward and backward inside
+    each block, then one elementwise max per output row, so the cost is O(rows) whatever the window.
+    The first window - 1 rows cover the shorter windows that are available. NaNs are ignored.
+    """
+    n, k = values.shape
+    padded_length = -(-(n + window - 1) // window) * window
+    padded = np.full((padded_length, k), -np.inf)
+    padded[window - 1:window - 1 + n] = np.where(np.isnan(values), -np.inf, values)
+    blocks = padded.reshape(-1, window, k)
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape(padded_length, k)
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded_length, k)
+    result = np.maximum(suffix[:n], prefix[window - 1:window - 1 + n])
+    return np.where(np.isneginf(result), np.nan, result)
+
+
+def sliding_min(values, window):
+    """Trailing-window minimum, see sliding_max."""
+    return -sliding_max(-values, window)
+
+
+class WilderRSI:
+    """
+    Relative Strength Index with Wilder smoothing, fed one price at a time.
+    The first average gain and loss are the simple means over the first `period` changes; after that each
+    average moves by alpha = 1 / period towards the new change, so an update is O(1) whatever the history.
+    update returns NaN until period + 1 prices have been seen.
+    """
+    def __init__(self, period=14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.previous_price = None
+        self.changes_seen = 0
+        self.average_gain = 0.0
+        self.average_loss = 0.0
+
+    def update(self, price):
+        price = float(price)
+        previous_price, self.previous_price = self.previous_price, price
+        if previous_price is None:
+            return np.nan
+        change = price - previous_price
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.changes_seen += 1
+
+        if self.changes_seen <= self.period:
+            # Warm-up: sum the first changes, in order, and turn the sums into means on the last one
+            self.average_gain += gain
+            self.average_loss += loss
+            if self.changes_seen < self.period:
+                return np.nan
+            self.average_gain /= self.period
+            self.average_loss /= self.period
+        else:
+            self.average_gain = self.alpha * gain + (1.0 - self.alpha) * self.average_gain
+            self.average_loss = self.alpha * loss + (1.0 - self.alpha) * self.average_loss
+        return _rsi(self.average_gain, self.average_loss)
+
+    @staticmethod
+    def calculate(prices, period=14):
+        """RSI for every bar of a price array in one vectorized pass; identical to feeding the prices to update."""
+        from scipy.signal import lfilter
+
+        prices = np.asarray(prices, dtype=np.float64)
+        rsi = np.full(prices.shape, np.nan)
+        if prices.size < period + 1:
+            return rsi
+        changes = np.diff(prices)
+        gains, losses = np.maximum(changes, 0.0), np.maximum(-changes, 0.0)
+        alpha = 1.0 / period
+
+        averages = []
+        for moves in (gains, losses):
+            # cumsum adds left to right like the streaming warm-up, and lfilter runs the same
+            # y[t] = alpha * x[t] + (1 - alpha) * y[t - 1] recurrence, so both modes round identically
+            seed = np.cumsum(moves[:period])[-1] / period
+            smoothed, _ = lfilter([alpha], [1.0, -(1.0 - alpha)], moves[period:], zi=[(1.0 - alpha) * seed])
+            averages.append(np.concatenate([[seed], smoothed]))
+        rsi[period:] = _rsi(*averages)
+        return rsi
+
+
+def _rsi(average_gain, average_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + np.divide(average_gain, average_loss))
+    # No losses over the window means RSI is 100
+    return np.where(average_loss == 0, 100.0, rsi)[()]
+
+
+class StockSpan:
+    """
+    Stock span (consecutive bars up to and including today with price <= today's), fed one price at a time.
+    Keeps a stack of the earlier bars that are still higher than everything after them; each bar is pushed and
+    popped at most once, so updates are amortised O(1).
+    """
+    def __init__(self):
+        self.stack = []
+        self.index = 0
+
+    def update(self, price):
+        while self.stack and self.stack[-1][1] <= price:
+            self.stack.pop()
+        span = self.index + 1 if not self.stack else self.index - self.stack[-1][0]
+        self.stack.append((self.index, price))
+        self.index += 1
+        return span
+
+    @staticmethod
+    def calculate(prices):
+        """
+        Spans of a whole price array, computed for every bar at once instead of one update at a time.
+        Each span ends at the previous higher bar, found by binary lifting over the window maxima of a
+        SparseTable: every bar starts at itself and steps back 2**k bars, for k from largest to smallest, as long
+        as no price in the skipped window is higher. That is O(log n) vectorized steps over all bars, O(n log n)
+        work in total, and gives the same spans as update.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        table = SparseTable(prices)
+        index = np.arange(prices.size)
+        start = index.copy()
+        for k in range(table.table_max.shape[0] - 1, -1, -1):
+            # table_max[k, j] is the maximum of prices[j:j + 2**k], here the window just before start
+            candidate = start - (1 << k)
+            valid = candidate >= 0
+            step = np.zeros(prices.size, dtype=bool)
+            step[valid] = table.table_max[k, candidate[valid]] <= prices[valid]
+            start[step] = candidate[step]
+        return (index - start + 1).astype(np.int64)
+
+
+class RollingExtrema:
+    """
+    Trailing-window minimum and maximum, fed one price at a time, over monotonic deques of (index, price).
+    The first window - 1 bars cover the shorter windows that are available, as in sliding_max.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.minima = deque()
+        self.maxima = deque()
+        self.index = 0
+
+    def update(self, price):
+        """Returns (minimum, maximum) over the last `window` prices including this one."""
+        while self.minima and self.minima[-1][1] >= price:
+            self.minima.pop()
+        while self.maxima and self.maxima[-1][1] <= price:
+            self.maxima.pop()
+        self.minima.append((self.index, price))
+        self.maxima.append((self.index, price))
+        oldest = self.index - self.window
+        if self.minima[0][0] <= oldest:
+            self.minima.popleft()
+        if self.maxima[0][0] <= oldest:
+            self.maxima.popleft()
+        self.index += 1
+        return self.minima[0][1], self.maxima[0][1]
+
+    @staticmethod
+    def calculate(prices, window):
+        """(minima, maxima) arrays over a whole price array, matching update bar for bar."""
+        prices = np.asarray(prices, dtype=np.float64)[:, None]
+        return sliding_min(prices, window)[:, 0], sliding_max(prices, window)[:, 0]
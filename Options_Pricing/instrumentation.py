@@ -0,0 +1,196 @@
+"""
+    Opt-in timing spans, counters and profiling for the pricing and data code.
+    Everything is off by default: span() then hands back one shared no-op context manager and count() returns
+    straight away, so instrumented code pays a function call and a flag check. Turn it on with enable(), read the
+    totals with snapshot(), and write the individual spans as a Chrome trace (chrome://tracing, Perfetto) with
+    export_chrome_trace(). Spans and counters are kept per process; work done in process pools is not collected.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+_lock = threading.Lock()
+_enabled = False
+_events = []
+_counters = defaultdict(int)
+_totals = {}
+_origin_ns = time.perf_counter_ns()
+
+
+def enable(reset_data=True):
+    global _enabled
+    if reset_data:
+        reset()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drops all recorded spans and counters."""
+    with _lock:
+        _events.clear()
+        _counters.clear()
+        _totals.clear()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        duration = (end - self.start) / 1e9
+        event = {'name': self.name, 'cat': self.category, 'ph': 'X', 'ts': (self.start - _origin_ns) / 1e3,
+                 'dur': (end - self.start) / 1e3, 'pid': os.getpid(), 'tid': threading.get_ident()}
+        if self.args:
+            event['args'] = {key: str(value) for key, value in self.args.items()}
+        with _lock:
+            _events.append(event)
+            total = _totals.setdefault(self.name, [0, 0.0, 0.0])
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], duration)
+        return False
+
+
+def span(name, category='pricing', **args):
+    """Context manager timing the enclosed block under name; a shared no-op while instrumentation is disabled."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def timed(name, category='pricing'):
+    """Decorator recording every call of the function as a span."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(name, category, None):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Adds value to the named counter, e.g. 'contracts_priced', 'paths_simulated' or 'cache_hits'."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += int(value)
+
+
+def snapshot():
+    """Counters and per-span call count, total, mean and max seconds, as plain dicts ready for JSON."""
+    with _lock:
+        spans = {name: {'count': calls, 'total_seconds': total, 'mean_seconds': total / calls, 'max_seconds': longest}
+                 for name, (calls, total, longest) in _totals.items()}
+        return {'enabled': _enabled, 'counters': dict(_counters), 'spans': spans}
+
+
+def export_chrome_trace(path):
+    """Writes the recorded spans, plus final counter values, in the Chrome trace event format."""
+    with _lock:
+        events = list(_events)
+        counters = dict(_counters)
+    timestamp = (time.perf_counter_ns() - _origin_ns) / 1e3
+    events += [{'name': name, 'ph': 'C', 'ts': timestamp, 'pid': os.getpid(), 'args': {name: value}}
+               for name, value in counters.items()]
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+@contextmanager
+def profile(output=None, sort='cumulative', limit=30):
+    """
+        Runs the block under cProfile. The statistics are dumped to output (for snakeviz, pstats, ...) when it is
+        given, else the top `limit` functions by `sort` are printed.
+    """
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output is not None:
+            profiler.dump_stats(output)
+        else:
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+            print(stream.getvalue())
+
+
+class SampledStacks:
+    """Stack samples taken by sample(), counted per call stack."""
+    def __init__(self):
+        self.counts = Counter()
+
+    def write_collapsed(self, path):
+        """Writes the samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+        with open(path, 'w') as f:
+            for stack, samples in self.counts.most_common():
+                f.write(f'{stack} {samples}\n')
+
+
+@contextmanager
+def sample(interval=0.005):
+    """
+        Samples the call stack of the calling thread every `interval` seconds from a background thread while the
+        block runs. Unlike profile() this does not slow the profiled code, at the price of statistical counts.
+    """
+    samples = SampledStacks()
+    target = threading.get_ident()
+    stop = threading.Event()
+
+    def sampler():
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(f'{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})')
+                frame = frame.f_back
+            if stack:
+                samples.counts[';'.join(reversed(stack))] += 1
+
+    thread = threading.Thread(target=sampler, daemon=True)
+    thread.start()
+    try:
+        yield samples
+    finally:
+        stop.set()
+        thread.join()
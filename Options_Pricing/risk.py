@@ -0,0 +1,139 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from Options_Pricing import instrumentation
+from Options_Pricing import ticker as ticker_data
+from Options_Pricing.Black_Scholes_Model import BlackScholesModel, _call_flags
+
+REVALUATION_METHODS = ('full', 'taylor')
+POSITION_COLUMNS = ('underlying_spot_price', 'strike_price', 'days_to_maturity', 'risk_free_rate', 'sigma',
+                    'option_type')
+SCENARIO_COLUMNS = ('spot_shock', 'vol_shock', 'rate_shock', 'days_passed')
+
+
+def scenario_grid(spot_shocks=(0.0,), vol_shocks=(0.0,), rate_shocks=(0.0,), days_passed=(0,)):
+    """
+        Every combination of the given shocks as a scenario table. Spot shocks are relative (-0.1 is spot -10%),
+        vol and rate shocks are absolute (0.05 is +5 vol points) and days_passed moves the valuation date forward.
+    """
+    return pd.DataFrame(list(itertools.product(spot_shocks, vol_shocks, rate_shocks, days_passed)),
+                        columns=list(SCENARIO_COLUMNS), dtype=np.float64)
+
+
+def historical_returns(data, column='Close', horizon_days=1):
+    """
+        Overlapping horizon_days returns of a price history (a DataFrame with `column`, a Series or an array of
+        prices), compounded from the daily pct_change series the ticker helpers work with.
+    """
+    if isinstance(horizon_days, bool) or not isinstance(horizon_days, (int, np.integer)) or horizon_days < 1:
+        raise ValueError(f"horizon_days must be a whole number of days >= 1, got {horizon_days!r}")
+    if isinstance(data, pd.DataFrame):
+        data = ticker_data.get_column(data, column)
+    prices = pd.Series(np.asarray(data, dtype=np.float64)).dropna().to_numpy()
+    return prices[horizon_days:] / prices[:-horizon_days] - 1.0
+
+
+class PortfolioRisk:
+    """
+        Scenario risk for a portfolio of European options under Black-Scholes.
+        positions is a DataFrame (or dict of arrays) with the POSITION_COLUMNS and an optional 'quantity' (default
+        1, negative for short positions). Revaluation is a (positions, scenarios) broadcast, either repricing every
+        position in every scenario ('full') or applying the second-order Greeks expansion around today ('taylor'),
+        and is run over blocks of scenarios so memory stays bounded by chunk_size elements.
+    """
+    def __init__(self, positions, chunk_size=2_000_000):
+        positions = pd.DataFrame(positions)
+        missing = set(POSITION_COLUMNS).difference(positions.columns)
+        if missing:
+            raise ValueError(f"positions are missing the column(s) {sorted(missing)}")
+        self.positions = positions
+        self.chunk_size = chunk_size
+        self.quantity = positions['quantity'].to_numpy(dtype=np.float64) if 'quantity' in positions \
+            else np.ones(len(positions))
+        self.S, self.K, self.days, self.r, self.sigma = (positions[column].to_numpy(dtype=np.float64)
+                                                         for column in POSITION_COLUMNS[:5])
+        self.option_type = positions['option_type'].to_numpy()
+        self.is_call = _call_flags(self.option_type, self.S.shape)
+        self.greeks = BlackScholesModel.calculate_greeks(self.S, self.K, self.days, self.r, self.sigma,
+                                                         self.option_type)
+
+    def base_values(self):
+        """Value of each position today."""
+        return self.quantity * self.greeks['price']
+
+    def _full_revaluation(self, spot_shock, vol_shock, rate_shock, days_passed):
+        S = self.S[:, None] * (1.0 + spot_shock)
+        sigma = np.maximum(self.sigma[:, None] + vol_shock, 1e-8)
+        days = self.days[:, None] - days_passed
+        expired = days <= 0
+        prices = BlackScholesModel.calculate_option_prices(S, self.K[:, None], np.where(expired, 1.0, days),
+                                                           self.r[:, None] + rate_shock, sigma,
+                                                           self.option_type[:, None])
+        if np.any(expired):
+            phi = np.where(self.is_call, 1.0, -1.0)[:, None]
+            prices = np.where(expired, np.maximum(phi * (S - self.K[:, None]), 0.0), prices)
+        return prices - self.greeks['price'][:, None]
+
+    def _taylor_revaluation(self, spot_shock, vol_shock, rate_shock, days_passed):
+        g = {name: values[:, None] for name, values in self.greeks.items()}
+        dS = self.S[:, None] * spot_shock
+        # theta and charm are per year of time passing
+        dt = days_passed / 365
+        return (g['delta'] * dS + 0.5 * g['gamma'] * dS ** 2 + g['vega'] * vol_shock + g['rho'] * rate_shock
+                + g['theta'] * dt + g['vanna'] * dS * vol_shock + 0.5 * g['volga'] * vol_shock ** 2
+                + g['charm'] * dS * dt)
+
+    def _blocks(self, scenarios, method):
+        """Yields (scenario slice, per-unit P&L of every position in those scenarios) block by block."""
+        if method not in REVALUATION_METHODS:
+            raise ValueError(f"Unknown revaluation method {method!r}, expected one of {REVALUATION_METHODS}")
+        scenarios = pd.DataFrame(scenarios)
+        shocks = [scenarios[column].to_numpy(dtype=np.float64) if column in scenarios else np.zeros(len(scenarios))
+                  for column in SCENARIO_COLUMNS]
+        revalue = self._full_revaluation if method == 'full' else self._taylor_revaluation
+        block = max(self.chunk_size // max(len(self.S), 1), 1)
+        for first in range(0, len(scenarios), block):
+            part = slice(first, first + block)
+            instrumentation.count('contracts_priced', len(self.S) * len(shocks[0][part]))
+            yield part, revalue(*(shock[part] for shock in shocks))
+
+    def position_pnl(self, scenarios, method='full'):
+        """(positions, scenarios) matrix of P&L per position, quantities included."""
+        pnl = np.empty((len(self.S), len(scenarios)))
+        with instrumentation.span('revalue', 'risk', method=method):
+            for part, unit_pnl in self._blocks(scenarios, method):
+                pnl[:, part] = self.quantity[:, None] * unit_pnl
+        return pnl
+
+    def pnl(self, scenarios, method='full'):
+        """Portfolio P&L in every scenario, without materialising the per-position matrix."""
+        pnl = np.empty(len(scenarios))
+        with instrumentation.span('revalue', 'risk', method=method):
+            for part, unit_pnl in self._blocks(scenarios, method):
+                pnl[part] = self.quantity @ unit_pnl
+        return pnl
+
+    def pnl_surface(self, spot_shocks, vol_shocks, method='full', rate_shock=0.0, days_passed=0):
+        """Portfolio P&L over a spot x vol shock grid, as a DataFrame indexed by spot shock with vol shock columns."""
+        scenarios = scenario_grid(spot_shocks, vol_shocks, (rate_shock,), (days_passed,))
+        surface = self.pnl(scenarios, method).reshape(len(spot_shocks), len(vol_shocks))
+        return pd.DataFrame(surface, index=pd.Index(spot_shocks, name='spot_shock'),
+                            columns=pd.Index(vol_shocks, name='vol_shock'))
+
+    def historical_var(self, returns, confidence_level=0.99, horizon_days=1, method='full'):
+        """
+            Historical-simulation value at risk and expected shortfall over horizon_days.
+            Each return (e.g. from historical_returns with the same horizon) becomes a scenario that shocks every
+            spot by that return while the positions age by horizon_days. Both figures are reported as positive
+            losses, with the sorted scenario P&L for inspection.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[np.isfinite(returns)]
+        scenarios = pd.DataFrame({'spot_shock': returns, 'days_passed': float(horizon_days)})
+        pnl = np.sort(self.pnl(scenarios, method))
+        var = -np.quantile(pnl, 1.0 - confidence_level)
+        tail = pnl[pnl <= -var]
+        return {'value_at_risk': var, 'expected_shortfall': -tail.mean(), 'confidence_level': confidence_level,
+                'horizon_days': horizon_days, 'scenarios': len(pnl), 'pnl': pnl}
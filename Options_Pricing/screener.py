@@ -0,0 +1,201 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+
+import pandas as pd
+import requests
+
+NIFTY_URL = 'https://www.screener.in/company/NIFTY/'
+RESULTS_TABLE_SELECTOR = 'table.data-table'
+# The <th> of the results table's Name column, whatever attributes or inline markup it carries
+_NAME_HEADING = re.compile(r'<th\b[^>]*>(?:\s|<[^>]*>)*Name(?:\s|<[^>]*>)*</th>', re.IGNORECASE)
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/123.0.0.0 Safari/537.36')
+
+
+class HttpFetcher:
+    """Fetches pages over one pooled requests session, which is enough for server-rendered pages and local fixtures."""
+    def __init__(self, session=None, timeout=30, pool_size=8):
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+        self.session = session
+
+    def fetch(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def close(self):
+        self.session.close()
+
+
+class BrowserFetcher:
+    """
+        Fetches pages with a small pool of headless Chrome drivers, created on first use and reused across pages.
+        Instead of sleeping a fixed time, each fetch waits until the results table is present, up to wait_timeout.
+    """
+    def __init__(self, pool_size=2, wait_timeout=30, ready_selector=RESULTS_TABLE_SELECTOR, headless=True):
+        self.pool_size = pool_size
+        self.wait_timeout = wait_timeout
+        self.ready_selector = ready_selector
+        self.headless = headless
+        self._drivers = []
+        self._idle = Queue()
+        self._lock = threading.Lock()
+
+    def _new_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless=new')
+        options.add_argument('start-maximized')
+        options.add_argument(f'user-agent={USER_AGENT}')
+        return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle.empty() and len(self._drivers) < self.pool_size:
+                driver = self._new_driver()
+                self._drivers.append(driver)
+                return driver
+        return self._idle.get()
+
+    def fetch(self, url):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        driver = self._acquire()
+        try:
+            driver.get(url)
+            WebDriverWait(driver, self.wait_timeout).until(
+                expected_conditions.presence_of_element_located((By.CSS_SELECTOR, self.ready_selector)))
+            return driver.page_source
+        finally:
+            self._idle.put(driver)
+
+    def close(self):
+        for driver in self._drivers:
+            driver.quit()
+        self._drivers = []
+        self._idle = Queue()
+
+
+def _unique(values):
+    return list(dict.fromkeys(values))
+
+
+def _parse_lxml(html):
+    import lxml.html
+
+    document = lxml.html.fromstring(html)
+    # The results table is the one with a Name column; the page can hold other tables
+    tables = document.xpath('//table[.//th[normalize-space()="Name"]]')
+    scope = tables[0] if tables else document
+    headings = _unique(th.text_content().strip() for th in scope.iter('th'))
+    rows = []
+    for tr in scope.iter('tr'):
+        cells = [td.text_content().strip() for td in tr.iter('td')]
+        if cells:
+            rows.append(cells)
+    return headings, rows
+
+
+def _parse_bs4(html):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    name_header = soup.find('th', string=lambda text: text is not None and text.strip() == 'Name')
+    table = name_header.find_parent('table') if name_header is not None else None
+    scope = table if table is not None else soup
+    headings = _unique(th.get_text(strip=True) for th in scope.find_all('th'))
+    rows = []
+    for tr in scope.find_all('tr'):
+        cells = [td.get_text(strip=True) for td in tr.find_all('td')]
+        if cells:
+            rows.append(cells)
+    return headings, rows
+
+
+def results_table_fragment(html):
+    """
+        The HTML of the results table (the one with a Name column), found by a text search without parsing the
+        page; the whole page when no such table is found.
+    """
+    match = _NAME_HEADING.search(html)
+    if match is None:
+        return html
+    start = html.rfind('<table', 0, match.start())
+    end = html.find('</table>', match.end())
+    if start < 0 or end < 0:
+        return html
+    return html[start:end + len('</table>')]
+
+
+def parse_results_table(html):
+    """Returns (headings, rows) of the screener results table, parsed with lxml when it is installed, else bs4."""
+    try:
+        return _parse_lxml(html)
+    except ImportError:
+        return _parse_bs4(html)
+
+
+class ScreenerScraper:
+    """
+        Scrapes the paginated results table of a screener.in company list, e.g. the Nifty 50 constituents.
+        Pages are fetched concurrently through a fetcher (HttpFetcher by default, BrowserFetcher for a real
+        browser), and parsed results are cached by a hash of the results table's HTML, so refreshing a page whose
+        table has not changed skips the parse even when the rest of the page (tokens, ads, timestamps) has.
+    """
+    def __init__(self, url=NIFTY_URL, fetcher=None, max_workers=4):
+        self.url = url
+        self.fetcher = fetcher if fetcher is not None else HttpFetcher()
+        self.max_workers = max_workers
+        self._parsed = {}
+        self.parse_count = 0
+
+    def page_url(self, page):
+        return self.url if page == 1 else f'{self.url}?page={page}'
+
+    def _parse(self, html):
+        fragment = results_table_fragment(html)
+        key = hashlib.sha256(fragment.encode()).hexdigest()
+        if key not in self._parsed:
+            self._parsed[key] = parse_results_table(fragment)
+            self.parse_count += 1
+        return self._parsed[key]
+
+    def scrape_pages(self, pages):
+        """Fetches and parses the given page numbers concurrently, returning [(headings, rows)] in page order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            documents = list(pool.map(self.fetcher.fetch, [self.page_url(page) for page in pages]))
+        return [self._parse(html) for html in documents]
+
+    def scrape(self, pages=(1, 2)):
+        """
+            Returns the results table over the given pages as a DataFrame, headed by the first page's columns,
+            without the serial number column and the median summary row.
+        """
+        results = self.scrape_pages(pages)
+        headings = results[0][0]
+        rows = [row for _, page_rows in results for row in page_rows]
+        df = pd.DataFrame([headings] + rows)
+        df.columns = list(df.iloc[0])
+        df = df.iloc[1:]
+        df = df.drop(columns='S.No.', errors='ignore')
+        if 'Name' in df.columns:
+            df = df[~df['Name'].astype(str).str.startswith('Median')]
+        return df.reset_index(drop=True)
+
+    def close(self):
+        self.fetcher.close()
@@ -0,0 +1,88 @@
+import os
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from Options_Pricing.screener import ScreenerScraper, HttpFetcher, _parse_bs4, _parse_lxml, results_table_fragment
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class _ScreenerHandler(BaseHTTPRequestHandler):
+    """Serves the saved screener pages, with a fresh token and timestamp on every request like the live site."""
+    pages = {}
+
+    def do_GET(self):
+        page = parse_qs(urlsplit(self.path).query).get('page', ['1'])[0]
+        template = self.pages.get(page)
+        if template is None:
+            self.send_error(404)
+            return
+        body = template.replace('{token}', uuid.uuid4().hex).replace('{timestamp}', uuid.uuid4().hex).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def screener_url():
+    _ScreenerHandler.pages = {'1': _read_fixture('screener_nifty_page1.html'),
+                              '2': _read_fixture('screener_nifty_page2.html')}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ScreenerHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/company/NIFTY/'
+    server.shutdown()
+    server.server_close()
+
+
+def test_scrape_combines_pages(screener_url):
+    scraper = ScreenerScraper(screener_url, HttpFetcher())
+    df = scraper.scrape(pages=(1, 2))
+    scraper.close()
+    assert list(df.columns) == ['Name', 'CMP Rs.', 'P/E', 'Mar Cap Rs.Cr.']
+    assert list(df['Name']) == ['Reliance Industr', 'TCS', 'HDFC Bank', 'Wipro', 'ITC']
+    assert df.loc[df['Name'] == 'ITC', 'P/E'].item() == '26.13'
+
+
+def test_unchanged_table_is_not_parsed_again(screener_url):
+    scraper = ScreenerScraper(screener_url, HttpFetcher())
+    first = scraper.scrape(pages=(1, 2))
+    # Every response carries new tokens, but the results tables are the same
+    second = scraper.scrape(pages=(1, 2))
+    assert scraper.parse_count == 2
+    assert first.equals(second)
+
+    _ScreenerHandler.pages['2'] = _ScreenerHandler.pages['2'].replace('481.25', '490.00')
+    third = scraper.scrape(pages=(1, 2))
+    scraper.close()
+    assert scraper.parse_count == 3
+    assert third.loc[third['Name'] == 'Wipro', 'CMP Rs.'].item() == '490.00'
+
+
+def test_fragment_excludes_other_tables():
+    html = _read_fixture('screener_nifty_page1.html')
+    fragment = results_table_fragment(html)
+    assert fragment.startswith('<table class="data-table') and fragment.endswith('</table>')
+    assert 'Screens' not in fragment and '{token}' not in fragment
+    assert results_table_fragment('<p>no table</p>') == '<p>no table</p>'
+
+
+@pytest.mark.parametrize('name', ['screener_nifty_page1.html', 'screener_nifty_page2.html'])
+def test_parsers_agree(name):
+    html = _read_fixture(name)
+    assert _parse_lxml(html) == _parse_bs4(html)
+    assert _parse_lxml(results_table_fragment(html)) == _parse_lxml(html)
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class SegmentTree:
+    """
+    Range minimum and maximum queries over a growable price series, with the tree held in two NumPy arrays.
+    Leaves sit at [size, 2 * size) and node i covers its children 2i and 2i + 1. The tree is built one level at a
+    time with a single np.minimum / np.maximum per level, and when an append finds the leaves full, size doubles
+    and the tree is rebuilt, so appends are amortised O(log n).
+    query_min / query_max take scalar indices or arrays of them and answer every (l, r) pair in one pass.
+    """
+    def __init__(self, data=(), capacity=1):
+        data = np.asarray(data, dtype=np.float64)
+        self.n = data.size
+        self.size_tree = 1
+        while self.size_tree < max(capacity, self.n, 1):
+            self.size_tree *= 2
+        self._build(data)
+
+    def _build(self, data):
+        self.tree_min = np.full(2 * self.size_tree, np.inf)
+        self.tree_max = np.full(2 * self.size_tree, -np.inf)
+        self.tree_min[self.size_tree:self.size_tree + data.size] = data
+        self.tree_max[self.size_tree:self.size_tree + data.size] = data
+        self._refresh(self.size_tree, self.size_tree + data.size)
+
+    def _refresh(self, first, last):
+        """Recomputes the ancestors of tree positions [first, last), level by level."""
+        while first > 1:
+            first, last = first // 2, (last - 1) // 2 + 1
+            self.tree_min[first:last] = np.minimum(self.tree_min[2 * first:2 * last:2],
+                                                   self.tree_min[2 * first + 1:2 * last:2])
+            self.tree_max[first:last] = np.maximum(self.tree_max[2 * first:2 * last:2],
+                                                   self.tree_max[2 * first + 1:2 * last:2])
+
+    @property
+    def values(self):
+        """The stored series, as a view into the leaves."""
+        return self.tree_min[self.size_tree:self.size_tree + self.n]
+
+    def update(self, index, value):
+        """Update the price at a given index and refresh the tree."""
+        if not 0 <= index < self.n:
+            raise ValueError(f"Index {index} is outside the {self.n} stored prices")
+        position = self.size_tree + index
+        self.tree_min[position] = value
+        self.tree_max[position] = value
+        self._refresh(position, position + 1)
+
+    def append(self, value):
+        """Append a new value to the data and update the tree."""
+        self.extend([value])
+
+    def extend(self, values):
+        """Appends many values at once, refreshing each tree level with one vectorized step."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if self.n + values.size > self.size_tree:
+            stored = self.values.copy()
+            while self.n + values.size > self.size_tree:
+                self.size_tree *= 2
+            self._build(stored)
+        first = self.size_tree + self.n
+        self.tree_min[first:first + values.size] = values
+        self.tree_max[first:first + values.size] = values
+        self.n += values.size
+        self._refresh(first, first + values.size)
+
+    def _query(self, tree, reduce, empty, l, r):
+        l, r = np.broadcast_arrays(np.asarray(l, dtype=np.int64), np.asarray(r, dtype=np.int64))
+        if np.any((l < 0) | (r >= self.n) | (l > r)):
+            raise ValueError(f"Query ranges must satisfy 0 <= l <= r < {self.n}")
+        result = np.full(l.shape, empty)
+        l = l + self.size_tree
+        r = r + self.size_tree
+        # Standard bottom-up walk, advanced for every query at once; once a range has closed it stays closed,
+        # since halving l and r can bring them back in order
+        open_ = np.ones(l.shape, dtype=bool)
+        while True:
+            open_ &= l <= r
+            if not np.any(open_):
+                break
+            take_left = open_ & (l % 2 == 1)
+            result = np.where(take_left, reduce(result, tree[np.where(take_left, l, 0)]), result)
+            l = l + take_left
+            take_right = open_ & (r % 2 == 0)
+            result = np.where(take_right, reduce(result, tree[np.where(take_right, r, 0)]), result)
+            r = r - take_right
+            l //= 2
+            r //= 2
+        return result[()]
+
+    def query_min(self, l, r):
+        """Return the minimum price in the range [l, r] (0-indexed); l and r may be arrays."""
+        return self._query(self.tree_min, np.minimum, np.inf, l, r)
+
+    def query_max(self, l, r):
+        """Return the maximum price in the range [l, r] (0-indexed); l and r may be arrays."""
+        return self._query(self.tree_max, np.maximum, -np.inf, l, r)
+
+
+class SparseTable:
+    """
+    Range minimum and maximum queries over a fixed series in O(1) each.
+    Row k of each table holds the extremum of every window of 2**k values, built with one vectorized step per
+    row; a query [l, r] combines the two windows of the largest such length that cover it. Building costs
+    O(n log n) time and memory, so use it for history that no longer changes and SegmentTree otherwise.
+    """
+    def __init__(self, data):
+        data = np.asarray(data, dtype=np.float64)
+        self.n = data.size
+        levels = max(int(self.n).bit_length(), 1)
+        self.table_min = np.empty((levels, self.n))
+        self.table_max = np.empty((levels, self.n))
+        self.table_min[0] = data
+        self.table_max[0] = data
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            width = self.n - (1 << k) + 1
+            np.minimum(self.table_min[k - 1, :width], self.table_min[k - 1, half:half + width],
+                       out=self.table_min[k, :width])
+            np.maximum(self.table_max[k - 1, :width], self.table_max[k - 1, half:half + width],
+                       out=self.table_max[k, :width])
+
+    def _query(self, table, reduce, l, r):
+        l, r = np.broadcast_arrays(np.asarray(l, dtype=np.int64), np.asarray(r, dtype=np.int64))
+        if np.any((l < 0) | (r >= self.n) | (l > r)):
+            raise ValueError(f"Query ranges must satisfy 0 <= l <= r < {self.n}")
+        k = np.log2(r - l + 1).astype(np.int64)
+        return reduce(table[k, l], table[k, r - (1 << k) + 1])[()]
+
+    def query_min(self, l, r):
+        """Return the minimum price in the range [l, r] (0-indexed); l and r may be arrays."""
+        return self._query(self.table_min, np.minimum, l, r)
+
+    def query_max(self, l, r):
+        """Return the maximum price in the range [l, r] (0-indexed); l and r may be arrays."""
+        return self._query(self.table_max, np.maximum, l, r)
@@ -1,29 +1,38 @@
-import datetime
-import yfinance as yf
-import requests_cache
-import matplotlib.pyplot as plt
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import pandas as pd
 
+from Options_Pricing import instrumentation
+from Options_Pricing.history_store import HistoryStore, _flatten_columns
+
+class FetchError(Exception):
+    """
+    Raised by fetch_historic_data_bulk when some tickers could not be fetched.
+    failures maps each of them to the error (or 'no data returned'); data holds the tickers that were fetched.
+    """
+    def __init__(self, failures, data):
+        details = ', '.join(f'{ticker} ({error})' for ticker, error in failures.items())
+        super().__init__(f"Failed to fetch {len(failures)} ticker(s): {details}")
+        self.failures = failures
+        self.data = data
+
+
+@instrumentation.timed('fetch', 'network')
 def get_historic_data(ticker, start_date=None, end_date=None, cache_data=True, cache_days=1):
-    """Fetch historical data for a ticker using yfinance with optional caching."""
+    """
+    Fetch historical data for a ticker using yfinance.
+    yfinance manages its own session and no longer accepts requests_cache sessions, so cache_data and
+    cache_days are kept for compatibility only; use a HistoryStore to keep downloads between runs.
+    """
     try:
-        # Configure cache settings
-        expire_after = datetime.timedelta(days=cache_days)
-        session = requests_cache.CachedSession(
-            cache_name='cache',
-            backend='sqlite',
-            expire_after=expire_after
-        )
-        session.headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0',
-            'Accept': 'application/json;charset=utf-8'
-        }
+        import yfinance as yf
 
         # Fetch data using yfinance
         if start_date and end_date:
-            data = yf.download(ticker, start=start_date, end=end_date, session=session)
+            data = yf.download(ticker, start=start_date, end=end_date)
         else:
-            data = yf.download(ticker, session=session)
+            data = yf.download(ticker)
 
         if data.empty:
             return None
@@ -34,12 +43,146 @@ def get_historic_data(ticker, start_date=None, end_date=None, cache_data=True, c
         return None
 
 
+@instrumentation.timed('fetch', 'network')
+def yfinance_source(ticker, start_date=None, end_date=None):
+    """Default data source for bulk fetches: one yfinance download, over yfinance's own session."""
+    import yfinance as yf
+
+    kwargs = {key: value for key, value in (('start', start_date), ('end', end_date)) if value}
+    return yf.download(ticker, progress=False, threads=False, **kwargs)
+
+
+@instrumentation.timed('fetch_bulk', 'network')
+def fetch_historic_data_bulk(tickers, start_date=None, end_date=None, store=None, data_source=None, max_workers=8):
+    """
+    Fetch historical data for many tickers over a bounded thread pool.
+    data_source(ticker, start_date, end_date) returns a DataFrame and defaults to yfinance_source; pass a local
+    stand-in to run offline. When store (a HistoryStore or a directory path) is given, each non-empty result is
+    persisted there so later reads come from read_stored_history instead of the network.
+    Returns a dict of ticker -> DataFrame. If any fetch raised or came back empty (yfinance reports failed
+    downloads as empty frames), FetchError is raised once all tickers are done, with the failures and the
+    tickers that were fetched.
+    """
+    data_source = data_source or yfinance_source
+    if store is not None and not isinstance(store, HistoryStore):
+        store = HistoryStore(store)
+
+    def fetch(ticker):
+        """Returns (data, None) or (None, error)."""
+        try:
+            data = data_source(ticker, start_date, end_date)
+        except Exception as e:
+            return None, e
+        if data is None or data.empty:
+            return None, 'no data returned'
+        if store is not None:
+            store.write(ticker, data)
+        return data, None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(tickers, pool.map(fetch, tickers)))
+    fetched = {ticker: data for ticker, (data, _) in results.items() if data is not None}
+    failures = {ticker: error for ticker, (data, error) in results.items() if data is None}
+    if failures:
+        raise FetchError(failures, fetched)
+    return fetched
+
+
+def _restated(stored_dates, stored_values, columns, fresh, tolerance):
+    """True if bars present in both the store and the fresh download disagree (split or dividend adjustment)."""
+    if [str(column) for column in _flatten_columns(fresh.columns)] != columns:
+        return True
+    fresh_dates = pd.DatetimeIndex(fresh.index).as_unit('ns').asi8
+    positions = np.searchsorted(stored_dates, fresh_dates)
+    # The last stored bar may have been a partial intraday bar, so only bars before it are compared
+    shared = positions < len(stored_dates) - 1
+    shared[shared] = stored_dates[positions[shared]] == fresh_dates[shared]
+    price_columns = [i for i, column in enumerate(columns) if column != 'Volume']
+    stored = np.asarray(stored_values[positions[shared]])[:, price_columns]
+    downloaded = fresh.to_numpy(dtype=np.float64)[shared][:, price_columns]
+    return not np.allclose(stored, downloaded, rtol=tolerance, atol=0.0, equal_nan=True)
+
+
+@instrumentation.timed('sync', 'network')
+def sync_historic_data(tickers, store, start_date=None, end_date=None, data_source=None, overlap_bars=5,
+                       tolerance=1e-8, max_workers=8):
+    """
+    Bring the stored history of many tickers up to date, downloading only the missing tail where possible.
+    For a ticker already in the store, the last overlap_bars stored bars are re-requested together with anything
+    newer. If the re-requested bars still match the stored ones within tolerance, the new bars are appended in
+    place. If they differ (a split or dividend restated past prices, or the columns changed), the full history
+    is downloaded again from start_date (or the first stored bar) and the symbol is rewritten. Tickers not yet
+    stored are downloaded from start_date.
+    Returns a dict of ticker -> 'created', 'appended', 'up_to_date', 'backfilled' or 'failed'.
+    """
+    data_source = data_source or yfinance_source
+    if not isinstance(store, HistoryStore):
+        store = HistoryStore(store)
+
+    def full_download(ticker, start):
+        data = data_source(ticker, start, end_date)
+        if data is None or data.empty:
+            return False
+        store.write(ticker, data)
+        return True
+
+    def sync(ticker):
+        try:
+            arrays = store.read_arrays(ticker)
+            if arrays is None or len(arrays[0]) == 0:
+                return 'created' if full_download(ticker, start_date) else 'failed'
+
+            dates, values, columns = arrays
+            # Memory maps are released before the files are rewritten
+            del arrays
+            last = dates[-1]
+            overlap_start = pd.Timestamp(int(dates[max(len(dates) - overlap_bars, 0)]))
+            fresh = data_source(ticker, overlap_start.strftime('%Y-%m-%d'), end_date)
+            # The overlap bars are always re-requested, so an empty answer means the download failed
+            if fresh is None or fresh.empty:
+                return 'failed'
+
+            if _restated(dates, values, columns, fresh, tolerance):
+                start = start_date or pd.Timestamp(int(dates[0])).strftime('%Y-%m-%d')
+                del dates, values
+                return 'backfilled' if full_download(ticker, start) else 'failed'
+
+            fresh_dates = pd.DatetimeIndex(fresh.index).as_unit('ns').asi8
+            tail = fresh[fresh_dates >= last]
+            has_new_bars = bool(np.any(fresh_dates > last))
+            del dates, values
+            if not tail.empty:
+                store.append(ticker, tail)
+            return 'appended' if has_new_bars else 'up_to_date'
+        except Exception as e:
+            print(f"Error syncing data for {ticker}: {e}")
+            return 'failed'
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(tickers, pool.map(sync, tickers)))
+
+
+def read_stored_history(tickers, store):
+    """Loads tickers from a HistoryStore (or directory path) as memory-mapped DataFrames, skipping missing ones."""
+    if not isinstance(store, HistoryStore):
+        store = HistoryStore(store)
+    frames = {ticker: store.read(ticker) for ticker in tickers}
+    return {ticker: data for ticker, data in frames.items() if data is not None}
+
+
 def get_columns(data):
     if data is None:
         return None
     return list(data.columns.get_level_values(0))
 
 
+def get_column(data, column_name):
+    """One column of a history as a Series, also when yfinance returned (field, ticker) columns for one symbol."""
+    column = data[column_name]
+    # Selecting the field of (field, ticker) columns leaves a one-column frame
+    return column.iloc[:, 0] if isinstance(column, pd.DataFrame) else column
+
+
 def get_last_price(data, column_name):
     if data is None or column_name not in get_columns(data):
         return None
@@ -48,6 +191,8 @@ def get_last_price(data, column_name):
 
 def plot_data(data, ticker):
     try:
+        import matplotlib.pyplot as plt
+
         if data is None:
             print("Invalid data provided.")
             return
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+class VasicekProcess:
+    """
+    Vasicek / Ornstein-Uhlenbeck process dX_t = theta * (mu - X_t) dt + sigma dW_t started at `initial`.
+    Paths are sampled from the exact Gaussian transition
+        X_{t+dt} = mu + (X_t - mu) * exp(-theta * dt) + sigma * sqrt((1 - exp(-2 * theta * dt)) / (2 * theta)) * Z,
+    so there is no discretisation bias whatever the step size. Because that is a linear recurrence in X - mu, all
+    paths and steps are generated by one lfilter call over a (paths, steps) block of normals.
+    """
+    def __init__(self, theta, mu, sigma, initial=0.0, T=1.0):
+        if theta < 0 or sigma < 0:
+            raise ValueError("theta and sigma must be non-negative")
+        self.theta = theta
+        self.mu = mu
+        self.sigma = sigma
+        self.initial = initial
+        self.T = T
+
+    def times(self, number_of_steps):
+        return np.linspace(0.0, self.T, number_of_steps + 1)
+
+    def marginal_expectation(self, t, initial=None):
+        x0 = self.initial if initial is None else initial
+        return x0 * np.exp(-self.theta * t) + self.mu * (1 - np.exp(-self.theta * t))
+
+    def marginal_variance(self, t):
+        if self.theta == 0:
+            return self.sigma ** 2 * np.asarray(t, dtype=np.float64)
+        return self.sigma ** 2 / 2 / self.theta * (1 - np.exp(-2 * self.theta * np.asarray(t, dtype=np.float64)))
+
+    def get_marginal(self, t, initial=None):
+        """Distribution of X_t as a frozen scipy.stats.norm."""
+        from scipy.stats import norm
+
+        return norm(loc=self.marginal_expectation(t, initial), scale=np.sqrt(self.marginal_variance(t)))
+
+    def _transition(self, dt):
+        """Decay factor and noise scale of one exact step of length dt."""
+        if self.theta == 0:
+            return 1.0, self.sigma * np.sqrt(dt)
+        # -expm1(-x) is 1 - exp(-x) without cancellation for small theta * dt
+        return np.exp(-self.theta * dt), self.sigma * np.sqrt(-np.expm1(-2 * self.theta * dt) / (2 * self.theta))
+
+    def _simulate_block(self, rng, number_of_paths, number_of_steps, initial, dtype):
+        from scipy.signal import lfilter
+
+        decay, scale = self._transition(self.T / number_of_steps)
+        start = np.broadcast_to(np.asarray(initial, dtype=dtype), (number_of_paths,))
+        noise = rng.standard_normal((number_of_paths, number_of_steps), dtype=dtype)
+        noise *= dtype(scale)
+        # Y_k = decay * Y_{k-1} + noise_k on Y = X - mu, started from Y_0 = initial - mu
+        offset = start - dtype(self.mu)
+        deviation, _ = lfilter(np.array([1.0], dtype=dtype), np.array([1.0, -decay], dtype=dtype), noise, axis=1,
+                               zi=(dtype(decay) * offset)[:, None])
+        paths = np.empty((number_of_paths, number_of_steps + 1), dtype=dtype)
+        paths[:, 0] = start
+        np.add(deviation, dtype(self.mu), out=paths[:, 1:])
+        return paths
+
+    def simulate(self, number_of_paths, number_of_steps, seed=None, initial=None, dtype=np.float64, chunk_size=None):
+        """
+        Returns a (number_of_paths, number_of_steps + 1) array of paths on times(number_of_steps), starting at
+        `initial` (the process default, or an array with one start per path). dtype may be np.float32 to halve
+        memory. With chunk_size, returns a generator of blocks of at most chunk_size paths instead, so path counts
+        that do not fit in memory can be streamed; the blocks are the same paths the single call would return.
+        """
+        dtype = np.dtype(dtype).type
+        initial = self.initial if initial is None else initial
+        initial = np.broadcast_to(np.asarray(initial, dtype=dtype), (number_of_paths,))
+        rng = np.random.default_rng(seed)
+        if chunk_size is None:
+            return self._simulate_block(rng, number_of_paths, number_of_steps, initial, dtype)
+        return self._simulate_chunks(rng, number_of_paths, number_of_steps, initial, dtype, chunk_size)
+
+    def _simulate_chunks(self, rng, number_of_paths, number_of_steps, initial, dtype, chunk_size):
+        for first in range(0, number_of_paths, chunk_size):
+            last = min(first + chunk_size, number_of_paths)
+            yield self._simulate_block(rng, last - first, number_of_steps, initial[first:last], dtype)
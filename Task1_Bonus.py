@@ -1,3 +1,10 @@
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import yfinance as yf
 import pandas as pd
 import numpy as np
@@ -5,12 +12,100 @@ import matplotlib.pyplot as plt
 from statsmodels.tsa.stattools import adfuller, kpss
 from scipy.stats import norm
 
+from Options_Pricing import ticker as ticker_data
+
+
+@lru_cache(maxsize=64)
+def _download(ticker, start_date, end_date):
+    """Downloads a ticker once per (ticker, start, end); callers get copies so they can add columns freely."""
+    return yf.download(ticker, start=start_date, end=end_date)
+
+
+def _run_test(test, values, params):
+    """Runs one stationarity test on a clean float array and returns a flat result dict."""
+    if test == 'adf':
+        result = adfuller(values, **params)
+        statistic, p_value, lags, critical_values = result[0], result[1], result[2], result[4]
+    else:
+        with warnings.catch_warnings():
+            # kpss warns when the statistic falls outside its p-value lookup table
+            warnings.simplefilter('ignore')
+            statistic, p_value, lags, critical_values = kpss(values, **params)
+    return {'statistic': float(statistic), 'p_value': float(p_value), 'lags': int(lags), 'observations': len(values),
+            'critical_1%': float(critical_values['1%']), 'critical_5%': float(critical_values['5%']),
+            'critical_10%': float(critical_values['10%'])}
+
+
+class StationarityCache:
+    """
+    Results of stationarity tests keyed by a hash of the series values plus the test and its parameters.
+    Entries live in memory and, when a directory is given, in one JSON file per key there, so unchanged
+    series are skipped across runs and processes.
+    """
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.results = {}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(values, test, params):
+        digest = hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        digest.update(json.dumps([test, params], sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        if key in self.results:
+            return self.results[key]
+        if self.directory:
+            path = os.path.join(self.directory, f'{key}.json')
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.results[key] = json.load(f)
+                return self.results[key]
+        return None
+
+    def put(self, key, result):
+        self.results[key] = result
+        if self.directory:
+            with open(os.path.join(self.directory, f'{key}.json'), 'w') as f:
+                json.dump(result, f)
+
+
+def run_stationarity_tests(series, adf_maxlag=12, kpss_regression='c', max_workers=None, cache=None):
+    """
+    Runs ADF and KPSS on many series across a process pool and returns one tidy DataFrame with a row per
+    (series, test). `series` maps names to pandas Series or arrays; NaNs are dropped first. Results found in
+    `cache` (a StationarityCache) are reused, and new ones are added to it.
+    """
+    tests = {'adf': {'maxlag': adf_maxlag}, 'kpss': {'regression': kpss_regression}}
+    rows, pending = [], []
+    for name, values in series.items():
+        values = np.asarray(pd.Series(values).dropna(), dtype=np.float64)
+        for test, params in tests.items():
+            key = StationarityCache.key(values, test, params)
+            result = cache.get(key) if cache is not None else None
+            rows.append({'series': name, 'test': test, 'key': key, 'result': result})
+            if result is None:
+                pending.append((len(rows) - 1, test, values, params))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            computed = pool.map(_run_test, *zip(*[(test, values, params) for _, test, values, params in pending]))
+            for (row, _, _, _), result in zip(pending, computed):
+                rows[row]['result'] = result
+                if cache is not None:
+                    cache.put(rows[row]['key'], result)
+
+    return pd.DataFrame([{'series': row['series'], 'test': row['test'], **row['result']} for row in rows])
+
+
 class StockAnalysis:
     def __init__(self, ticker, start_date, end_date):
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date
-        self.stock_data = yf.download(self.ticker, start=self.start_date, end=self.end_date)
+        self.stock_data = _download(self.ticker, self.start_date, self.end_date).copy()
         self.stock_data['Daily Returns'] = self.stock_data['Close'].pct_change()
 
     def plot_distributions(self):
@@ -54,8 +149,18 @@ class StockAnalysis:
         self.adf_test(self.stock_data['Daily Returns'])
         self.kpss_test(self.stock_data['Daily Returns'])
 
+    def stationarity_table(self, other_tickers=(), max_workers=None, cache=None):
+        """ADF and KPSS results for the close prices and daily returns of this and other tickers, as one table."""
+        series = {}
+        for ticker in (self.ticker, *other_tickers):
+            data = self.stock_data if ticker == self.ticker else _download(ticker, self.start_date, self.end_date)
+            close = ticker_data.get_column(data, 'Close')
+            series[f'{ticker} Close'] = close
+            series[f'{ticker} Daily Returns'] = close.pct_change()
+        return run_stationarity_tests(series, max_workers=max_workers, cache=cache)
+
     def analyze_other_stock(self, other_ticker):
-        stock_data_other = yf.download(other_ticker, start=self.start_date, end=self.end_date)
+        stock_data_other = _download(other_ticker, self.start_date, self.end_date).copy()
         stock_data_other['Daily Returns'] = stock_data_other['Close'].pct_change()
         print(f"\nStationarity Tests for {other_ticker} Close Price")
         self.adf_test(stock_data_other['Close'])
@@ -64,7 +169,8 @@ class StockAnalysis:
         self.adf_test(stock_data_other['Daily Returns'])
         self.kpss_test(stock_data_other['Daily Returns'])
 
-stock_analysis = StockAnalysis('AAPL', '2023-01-01', '2024-01-01')
-stock_analysis.plot_distributions()
-stock_analysis.perform_tests()
-stock_analysis.analyze_other_stock('MSFT')
+if __name__ == '__main__':
+    stock_analysis = StockAnalysis('AAPL', '2023-01-01', '2024-01-01')
+    stock_analysis.plot_distributions()
+    stock_analysis.perform_tests()
+    stock_analysis.analyze_other_stock('MSFT')
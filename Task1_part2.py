@@ -1,5 +1,17 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
+
+from Options_Pricing import ticker as ticker_data
+from Options_Pricing.indicators import sliding_max, sliding_min
+
+
+def _right_align(prices):
+    """
+    Sorts each column's observations below its NaNs, keeping their order, so the last `window` rows of a column
+    are that ticker's last `window` trading days. Returns the aligned matrix and the row order that produced it.
+    """
+    order = np.argsort(~np.isnan(prices), axis=0, kind='stable')
+    return np.take_along_axis(prices, order, axis=0), order
 
 
 class Nifty50Returns:
@@ -7,36 +19,84 @@ class Nifty50Returns:
         self.ticker_list = ticker_list
         self.data = {}
 
-    def fetch_data(self, start_date, end_date):
-        for ticker in self.ticker_list:
-            stock_data = yf.download(ticker, start=start_date, end=end_date, progress=False)
-            if not stock_data.empty:
-                self.data[ticker] = stock_data
-
-    def calculate_returns(self):
-        results = []  # List to store data rows
+    def fetch_data(self, start_date, end_date, store=None, data_source=None, max_workers=8):
+        """
+        Downloads every ticker concurrently (and persists it when a store is given). Tickers that could not be
+        fetched are reported and left out; returns them as a dict of ticker -> error.
+        """
+        try:
+            fetched, failures = ticker_data.fetch_historic_data_bulk(
+                self.ticker_list, start_date, end_date, store=store, data_source=data_source,
+                max_workers=max_workers), {}
+        except ticker_data.FetchError as e:
+            fetched, failures = e.data, e.failures
+            print(e)
+        self.data.update(fetched)
+        return failures
+
+    def price_matrix(self, column='Adj Close'):
+        """Aligns one price column of every ticker into a wide date x ticker DataFrame (NaN where not traded)."""
+        columns = {}
         for ticker, df in self.data.items():
-            # Calculate 5-year return based on start and end values
-            five_year_return = self.calculate_five_year_return(df)
-
-            # Calculate other returns
-            one_year_return = self.calculate_period_return(df, 12)
-            six_month_return = self.calculate_period_return(df, 6)
-
-            # Calculate 52-week high and low
-            one_year_data = df.iloc[-252:]  # Last year (approx. 252 trading days)
-            highest_close = one_year_data['Adj Close'].max()
-            lowest_close = one_year_data['Adj Close'].min()
-
-            # Append the data for this ticker
-            results.append([ticker, five_year_return, one_year_return, six_month_return, highest_close, lowest_close])
-
-        # Convert the results list to DataFrame
-        results_df = pd.DataFrame(results, columns=[
-            'Ticker', '5_Year_Return', '1_Year_Return', '6_Month_Return', '52_Week_High', '52_Week_Low'
-        ])
-
-        return results_df
+            columns[ticker] = ticker_data.get_column(df, column)
+        return pd.DataFrame(columns).sort_index()
+
+    def calculate_returns(self, horizons_in_months=(12, 6), window=252):
+        """
+        Return table for all tickers from one pass over the aligned price matrix.
+        The 5-year return runs from each ticker's first to its last price. Each horizon return is read with a
+        searchsorted as-of lookup: the last price on or before the ticker's last date minus that many months.
+        The 52-week high/low cover each ticker's last `window` trading days. The default horizons reproduce the
+        original 1-year and 6-month columns; other horizons add '<months>_Month_Return' columns.
+        """
+        matrix = self.price_matrix()
+        dates = matrix.index
+        prices = matrix.to_numpy(dtype=np.float64)
+        n, k = prices.shape
+        columns = np.arange(k)
+        valid = ~np.isnan(prices)
+
+        first = np.argmax(valid, axis=0)
+        last = n - 1 - np.argmax(valid[::-1], axis=0)
+        end_price = prices[last, columns]
+        results = {'Ticker': list(matrix.columns),
+                   '5_Year_Return': (end_price - prices[first, columns]) / prices[first, columns] * 100}
+
+        # Forward-filled row indices give each ticker's last own price at or before any date
+        filled_rows = np.maximum.accumulate(np.where(valid, np.arange(n)[:, None], -1), axis=0)
+        end_dates = dates[last]
+        for months in horizons_in_months:
+            start_dates = end_dates - pd.DateOffset(months=months)
+            rows = dates.searchsorted(start_dates, side='right') - 1
+            source_rows = np.where(rows >= 0, filled_rows[np.maximum(rows, 0), columns], -1)
+            start_price = np.where(source_rows >= 0, prices[np.maximum(source_rows, 0), columns], np.nan)
+            name = {12: '1_Year_Return', 6: '6_Month_Return'}.get(months, f'{months}_Month_Return')
+            results[name] = (end_price - start_price) / start_price * 100
+
+        aligned = _right_align(prices)[0][-window:]
+        with np.errstate(all='ignore'):
+            results['52_Week_High'] = np.nanmax(aligned, axis=0)
+            results['52_Week_Low'] = np.nanmin(aligned, axis=0)
+
+        results_df = pd.DataFrame(results)
+        leading = ['Ticker', '5_Year_Return'] + [column for column in results_df.columns
+                                                 if column not in ('Ticker', '5_Year_Return', '52_Week_High', '52_Week_Low')]
+        return results_df[leading + ['52_Week_High', '52_Week_Low']]
+
+    def calculate_rolling_extrema(self, window=252):
+        """
+        Rolling highs and lows over each ticker's last `window` trading days, as two date x ticker DataFrames.
+        Windows count the ticker's own observations, as the 52-week columns of calculate_returns do, and dates
+        the ticker did not trade on carry its last values forward, so the last row matches those columns.
+        """
+        matrix = self.price_matrix()
+        aligned, order = _right_align(matrix.to_numpy(dtype=np.float64))
+        extrema = []
+        for sliding in (sliding_max, sliding_min):
+            values = np.empty_like(aligned)
+            np.put_along_axis(values, order, sliding(aligned, window), axis=0)
+            extrema.append(pd.DataFrame(values, index=matrix.index, columns=matrix.columns).ffill())
+        return tuple(extrema)
 
     @staticmethod
     def calculate_five_year_return(df):
@@ -76,13 +136,14 @@ nifty50_tickers = [
     'ICICIGI.NS', 'ICICIPRULI.NS', 'SBICARD.NS', 'INDUSINDBK.NS', 'BAJAJHLDNG.NS'
 ]
 
-# Initialize and process the data
-start_date = '2019-01-01'
-end_date = '2024-01-01'
+if __name__ == '__main__':
+    # Initialize and process the data
+    start_date = '2019-01-01'
+    end_date = '2024-01-01'
 
-nifty50_returns = Nifty50Returns(nifty50_tickers)
-nifty50_returns.fetch_data(start_date, end_date)
-final_df = nifty50_returns.calculate_returns()
+    nifty50_returns = Nifty50Returns(nifty50_tickers)
+    nifty50_returns.fetch_data(start_date, end_date)
+    final_df = nifty50_returns.calculate_returns()
 
-# Display the final DataFrame
-print(final_df)
+    # Display the final DataFrame
+    print(final_df)
@@ -0,0 +1,55 @@
+"""
+    Error against wall time for the binomial tree variants (CRR, LR, BBS, BBSR).
+    European contracts are measured against the closed-form BlackScholesModel price. American puts have no closed
+    form, so they are measured against a Leisen-Reimer tree with --reference-steps steps.
+
+    Run from the repository root:  python -m benchmarks.bench_binomial_convergence
+"""
+import argparse
+import time
+
+from Options_Pricing.BinomialTreemodel import BinomialTreePricing, TREE_METHOD
+from Options_Pricing.Black_Scholes_Model import BlackScholesModel
+from Options_Pricing.base import OPTION_TYPE, EXERCISE_STYLE
+
+CONTRACT = dict(underlying_spot_price=100.0, strike_price=105.0, days_to_maturity=200, risk_free_rate=0.04, sigma=0.3)
+STEP_COUNTS = (25, 50, 100, 200, 400, 800, 1600, 3200, 10000)
+
+
+def time_price(number_of_time_steps, exercise_style, method, option_type, repeats):
+    model = BinomialTreePricing(**CONTRACT, number_of_time_steps=number_of_time_steps, exercise_style=exercise_style,
+                                method=method)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        price = model.calculate_option_price(option_type)
+        timings.append(time.perf_counter() - start)
+    return price, min(timings)
+
+
+def report(title, reference, exercise_style, option_type, step_counts, repeats):
+    print(f"\n{title}  (reference {reference:.10f})")
+    print(f"{'method':<6}{'steps':>8}{'abs error':>14}{'seconds':>12}")
+    for method in TREE_METHOD:
+        for steps in step_counts:
+            price, seconds = time_price(steps, exercise_style, method.value, option_type, repeats)
+            print(f"{method.value:<6}{steps:>8}{abs(price - reference):>14.3e}{seconds:>12.5f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--reference-steps', type=int, default=20001)
+    parser.add_argument('--american-max-steps', type=int, default=3200,
+                        help='American trees above this step count are skipped to keep the run short')
+    args = parser.parse_args()
+
+    european_reference = BlackScholesModel(**CONTRACT).calculate_option_price(OPTION_TYPE.PUT_OPTION.value)
+    report('European put', european_reference, EXERCISE_STYLE.EUROPEAN.value, OPTION_TYPE.PUT_OPTION.value,
+           STEP_COUNTS, args.repeats)
+
+    american_reference = BinomialTreePricing(**CONTRACT, number_of_time_steps=args.reference_steps,
+                                             exercise_style=EXERCISE_STYLE.AMERICAN.value,
+                                             method=TREE_METHOD.LR.value).calculate_option_price(OPTION_TYPE.PUT_OPTION.value)
+    report('American put', american_reference, EXERCISE_STYLE.AMERICAN.value, OPTION_TYPE.PUT_OPTION.value,
+           [steps for steps in STEP_COUNTS if steps <= args.american_max_steps], 1)
@@ -0,0 +1,43 @@
+"""
+    Import time of the pricing modules, each measured in a fresh interpreter.
+    For every module the median wall time of `python -c "import <module>"` over --repeats runs is reported, with
+    the heavy optional dependencies that the import pulled in. Pricing modules should load none of them.
+
+    Run from the repository root:  python -m benchmarks.bench_import_time
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ('Options_Pricing', 'Options_Pricing.Black_Scholes_Model', 'Options_Pricing.BinomialTreemodel',
+           'Options_Pricing.MonteCarloSimulation', 'Options_Pricing.FiniteDifferenceModel',
+           'Options_Pricing.implied_volatility', 'Options_Pricing.ticker')
+HEAVY_DEPENDENCIES = ('matplotlib', 'yfinance', 'requests_cache', 'scipy.stats', 'scipy.signal', 'pandas')
+
+PROBE = "import sys, json, {module}; print(json.dumps([name for name in {heavy!r} if name in sys.modules]))"
+
+
+def measure(module, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_DEPENDENCIES)],
+                                check=True, capture_output=True, text=True).stdout
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), json.loads(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    baseline, _ = measure('sys', args.repeats)
+    print(f"interpreter start-up {baseline * 1000:.0f} ms (subtracted below)")
+    print(f"{'module':<40}{'import ms':>10}  heavy dependencies loaded")
+    for module in MODULES:
+        seconds, loaded = measure(module, args.repeats)
+        print(f"{module:<40}{(seconds - baseline) * 1000:>10.0f}  {', '.join(loaded) or '-'}")
@@ -0,0 +1,195 @@
+"""
+    Offline benchmark suite for BlackScholesModel, BinomialTreePricing and MonteCarloPricing.
+    Every case prices synthetic contracts (no network access) and records latency percentiles, throughput in
+    contracts per second, peak traced memory and the largest error against the closed-form Black-Scholes price.
+    Results are written as JSON and compared against a baseline: a case whose median latency or error exceeds the
+    baseline by more than --tolerance makes the run exit with status 1. The reference results pinned in
+    benchmarks/baseline.json (and baseline_quick.json for --quick) are the default baseline; latencies only compare
+    on similar hardware, so after an intended change, or on a new reference machine, refresh them with --output and
+    commit the file.
+
+    Run from the repository root:
+        python -m benchmarks.bench_pricing_suite
+        python -m benchmarks.bench_pricing_suite --quick --output benchmarks/baseline_quick.json
+        python -m benchmarks.bench_pricing_suite --baseline results.json
+        python -m benchmarks.bench_pricing_suite --baseline none
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from Options_Pricing.BinomialTreemodel import BinomialTreePricing
+from Options_Pricing.Black_Scholes_Model import BlackScholesModel
+from Options_Pricing.MonteCarloSimulation import MonteCarloPricing
+from Options_Pricing.base import OPTION_TYPE
+
+CALL = OPTION_TYPE.CALL_OPTION.value
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+
+def synthetic_contracts(size, seed=7, max_days=730):
+    """Random but reproducible contracts around a spot of 100."""
+    rng = np.random.default_rng(seed)
+    return dict(underlying_spot_price=np.full(size, 100.0), strike_price=rng.uniform(70.0, 130.0, size),
+                days_to_maturity=rng.integers(10, max_days, size).astype(np.float64),
+                risk_free_rate=rng.uniform(0.0, 0.08, size), sigma=rng.uniform(0.1, 0.6, size))
+
+
+def scalar_contracts(contracts):
+    return [dict(zip(contracts, values)) for values in zip(*contracts.values())]
+
+
+def black_scholes_reference(contracts):
+    return BlackScholesModel.calculate_option_prices(**contracts, option_type=CALL)
+
+
+def black_scholes_scalar(size):
+    contracts = synthetic_contracts(size)
+    single = scalar_contracts(contracts)
+    return lambda: np.array([BlackScholesModel(**c).calculate_option_price(CALL) for c in single]), contracts
+
+
+def black_scholes_batch(size):
+    contracts = synthetic_contracts(size)
+    return lambda: BlackScholesModel.calculate_option_prices(**contracts, option_type=CALL), contracts
+
+
+def binomial_scalar(size, steps):
+    contracts = synthetic_contracts(size)
+    single = scalar_contracts(contracts)
+    return lambda: np.array([BinomialTreePricing(**c, number_of_time_steps=steps).calculate_option_price(CALL)
+                             for c in single]), contracts
+
+
+def binomial_batch(size, steps):
+    contracts = synthetic_contracts(size)
+    return lambda: BinomialTreePricing.calculate_option_prices(**contracts, number_of_time_steps=steps,
+                                                               option_type=CALL), contracts
+
+
+def monte_carlo(size, paths):
+    # Short maturities keep the daily time grid, and so the run, small
+    contracts = synthetic_contracts(size, max_days=60)
+    single = scalar_contracts(contracts)
+
+    def run():
+        prices = []
+        for c in single:
+            c = dict(c, days_to_maturity=int(c['days_to_maturity']))
+            model = MonteCarloPricing(**c, number_of_simulations=paths)
+            model.simulate_price(seed=11)
+            prices.append(model.calculate_option_price(CALL))
+        return np.array(prices)
+    return run, contracts
+
+
+def cases(quick):
+    """(name, (run, contracts)) pairs; names carry the sizes, so baselines only compare like with like."""
+    scale = 10 if quick else 1
+    size = 1000 // scale
+    yield f'black_scholes_scalar_{size}', black_scholes_scalar(size)
+    for size in (1, 1000, 100_000 // scale):
+        yield f'black_scholes_batch_{size}', black_scholes_batch(size)
+    for steps in (100, 1000):
+        size = 50 // scale
+        yield f'binomial_scalar_{size}x{steps}_steps', binomial_scalar(size, steps)
+    for steps in (100, 1000):
+        size = 1000 // scale
+        yield f'binomial_batch_{size}x{steps}_steps', binomial_batch(size, steps)
+    for paths in (10_000 // scale, 100_000 // scale):
+        yield f'monte_carlo_5x{paths}_paths', monte_carlo(5, paths)
+
+
+def measure(run, contracts, repeats):
+    size = len(contracts['strike_price'])
+    run()  # warm-up
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        prices = run()
+        latencies.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run, since tracing slows allocation-heavy code down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.array(latencies)
+    median = float(np.percentile(latencies, 50))
+    return {'contracts': size, 'repeats': repeats,
+            'latency_p50': median, 'latency_p95': float(np.percentile(latencies, 95)),
+            'latency_p99': float(np.percentile(latencies, 99)), 'latency_min': float(latencies.min()),
+            'contracts_per_second': size / median, 'peak_memory_bytes': int(peak),
+            'max_abs_error': float(np.max(np.abs(prices - black_scholes_reference(contracts))))}
+
+
+def compare(results, baseline, tolerance, min_slowdown=0.0):
+    """
+    Returns a list of regressions against the baseline cases of the same name. A slowdown also has to exceed
+    min_slowdown seconds, since sub-millisecond medians move by more than any useful tolerance between runs.
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get('cases', {}).get(name)
+        if reference is None:
+            continue
+        if result['latency_p50'] > max(reference['latency_p50'] * (1 + tolerance),
+                                       reference['latency_p50'] + min_slowdown):
+            regressions.append(f"{name}: median latency {result['latency_p50']:.6f}s vs "
+                               f"baseline {reference['latency_p50']:.6f}s")
+        if result['max_abs_error'] > reference['max_abs_error'] * (1 + tolerance) + 1e-12:
+            regressions.append(f"{name}: error {result['max_abs_error']:.3e} vs baseline {reference['max_abs_error']:.3e}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--quick', action='store_true', help='smaller sizes, for a smoke run')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against, 'none' to skip the "
+                                           "comparison (default: the pinned baseline.json or baseline_quick.json)")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative slowdown (and error increase) before a case counts as a regression')
+    parser.add_argument('--min-slowdown', type=float, default=0.001,
+                        help='smallest slowdown in seconds that counts as a regression')
+    args = parser.parse_args()
+    if args.baseline is None:
+        args.baseline = os.path.join(BENCHMARKS, 'baseline_quick.json' if args.quick else 'baseline.json')
+    elif args.baseline.lower() == 'none':
+        args.baseline = None
+
+    results = {}
+    print(f"{'case':<32}{'p50 s':>12}{'p95 s':>12}{'contracts/s':>14}{'peak MiB':>10}{'max error':>12}")
+    for name, (run, contracts) in cases(args.quick):
+        result = measure(run, contracts, args.repeats)
+        results[name] = result
+        print(f"{name:<32}{result['latency_p50']:>12.6f}{result['latency_p95']:>12.6f}"
+              f"{result['contracts_per_second']:>14.1f}{result['peak_memory_bytes'] / 2 ** 20:>10.2f}"
+              f"{result['max_abs_error']:>12.3e}")
+
+    report = {'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+              'quick': args.quick, 'cases': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        environment = [key for key in ('python', 'numpy', 'machine') if baseline.get(key) != report[key]]
+        if environment:
+            print(f"Note: the baseline was recorded with a different {', '.join(environment)}")
+        regressions = compare(results, baseline, args.tolerance, args.min_slowdown)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")